@@ -53,6 +53,9 @@ fi
 IMAGE_TAG="latest"
 IMAGE_URI="${REPO}/${IMAGE_NAME}:${IMAGE_TAG}"
 
+# --- Stage the modules shared between connectors into the build context ---
+rm -rf shared && cp -r ../src/shared shared
+
 # --- Build the Docker Image ---
 echo "Building Docker image: ${IMAGE_URI}..."
 # Use the Dockerfile for PySpark
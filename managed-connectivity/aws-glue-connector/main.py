@@ -1,8 +1,11 @@
+import os
 import sys
-from src import bootstrap
 
 # Allow shared files to be found when running from command line
-sys.path.insert(1, '../src/shared')
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src', 'shared'))
+
+from src import bootstrap
 
 if __name__ == '__main__':
     bootstrap.run()
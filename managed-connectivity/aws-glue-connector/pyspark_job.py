@@ -1,9 +1,20 @@
 import json
+import os
+import sys
+
+# Allow shared files to be found when running from command line
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src', 'shared'))
+
 from pyspark.sql import SparkSession
 from src.aws_glue_connector import AWSGlueConnector
 from src.entry_builder import build_database_entry, build_dataset_entry
 from src.gcs_uploader import GCSUploader
 from src.secret_manager import SecretManager
+from src.constants import SOURCE_TYPE
+
+# Shared between connectors, see managed-connectivity/src/shared
+import entry_diff
 
 def main():
     """
@@ -58,14 +69,33 @@ def main():
         bucket_name=config['gcs_bucket']
     )
 
+    # Skip entries unchanged since the previous run
+    diff = None
+    if config.get('changed_only'):
+        state_prefix = f"{SOURCE_TYPE}/state/aws-glue-output-{config['aws_region']}"
+        diff = entry_diff.EntryDiff(entry_diff.HashIndex.loads(
+            gcs_uploader.read_text(f"{state_prefix}-hashes.json")))
+        dataplex_entries = list(diff.changed(dataplex_entries))
+        print(f"{diff.unchanged_count} unchanged entries skipped.")
+
     # Upload to GCS
     print(f"Uploading entries to GCS bucket: {config['gcs_bucket']}/{config['output_folder']}...")
     gcs_uploader.upload_entries(
         entries=dataplex_entries,
         aws_region=config['aws_region'],
-        output_folder=config['output_folder']
+        output_folder=config['output_folder'],
+        max_entries=config.get('max_shard_entries'),
+        max_bytes=config.get('max_shard_bytes')
     )
     print("Upload complete.")
+
+    if diff is not None:
+        # Saved only when the output is uploaded, so a failed run is repeated
+        gcs_uploader.write_text(f"{state_prefix}-hashes.json", diff.current.dumps())
+        tombstones = diff.tombstones()
+        print(f"{len(tombstones)} entries removed since the previous run.")
+        # Written even if empty, so tombstones of a former run aren't kept
+        gcs_uploader.write_text(f"{state_prefix}-tombstones.json", json.dumps(tombstones))
     
     # Stop the Spark Session
     spark.stop()
@@ -0,0 +1,100 @@
+"""Microbenchmark of the serialization of import items.
+
+Builds entries of a synthetic Glue catalog and serializes them the way the
+connector did before (json.dumps per entry) and with the shared
+serialization module (orjson, or the compact standard library fallback).
+Entries are generated lazily, so memory stays flat for large catalogs.
+
+Usage, from the aws-glue-connector folder:
+    python scripts/benchmark_serialization.py --entries 1000000
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+CONNECTOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, CONNECTOR_DIR)
+sys.path.insert(1, os.path.join(CONNECTOR_DIR, '..', 'src', 'shared'))
+
+import serialization
+from src.entry_builder import build_dataset_entry
+
+CONFIG = {
+    "aws_region": "eu-north-1",
+    "aws_account_id": "000000000000",
+    "project_id": "benchmark-project",
+    "location_id": "us-central1",
+    "entry_group_id": "aws-glue-assets",
+}
+
+COLUMN_TYPES = ["bigint", "string", "double", "timestamp", "date",
+                "varchar(255)", "decimal(10,2)", "boolean", "array<string>"]
+
+
+def synthetic_tables(count: int, columns: int = 12, tables_per_db: int = 1000):
+    """Yields (database, Glue table) pairs, every tenth table is a view."""
+    for i in range(count):
+        table = {
+            "Name": f"table_{i}",
+            "TableType": "EXTERNAL_TABLE",
+            "StorageDescriptor": {"Columns": [
+                {"Name": f"column_{c}", "Type": COLUMN_TYPES[c % len(COLUMN_TYPES)]}
+                for c in range(columns)]},
+        }
+        if i % 10 == 0:
+            table["TableType"] = "VIRTUAL_VIEW"
+            table["ViewOriginalText"] = \
+                f"SELECT * FROM table_{i + 1} JOIN table_{i + 2} USING (column_0)"
+        yield f"database_{i // tables_per_db}", table
+
+
+def run(count: int, columns: int, encoders, chunk_size: int = 50_000):
+    """Builds the entries in chunks and times every encoder on every chunk.
+
+    Returns seconds spent building the entries and seconds spent
+    by every encoder, with the total size of its output.
+    """
+    build_time = 0.0
+    encode_time = {name: 0.0 for name in encoders}
+    size = {name: 0 for name in encoders}
+    tables = synthetic_tables(count, columns)
+    while True:
+        start = time.perf_counter()
+        chunk = [build_dataset_entry(CONFIG, db_name, table, {})
+                 for db_name, table in itertools.islice(tables, chunk_size)]
+        build_time += time.perf_counter() - start
+        if not chunk:
+            return build_time, encode_time, size
+        for name, encode in encoders.items():
+            start = time.perf_counter()
+            size[name] += sum(len(encode(entry)) for entry in chunk)
+            encode_time[name] += time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1_000_000,
+                        help="Number of tables and views in the catalog")
+    parser.add_argument("--columns", type=int, default=12,
+                        help="Number of columns of every table")
+    args = parser.parse_args()
+
+    print(f"{args.entries:,} entries, {args.columns} columns each, "
+          f"serialization backend: {serialization.BACKEND}")
+    encoders = {"before: json.dumps": json.dumps,
+                f"after: {serialization.BACKEND}": serialization.dumps}
+    build_time, encode_time, size = run(args.entries, args.columns, encoders)
+
+    print(f"{'':<24}{'serialize':>24}{'build + serialize':>26}{'output':>12}")
+    for name in encoders:
+        print(f"{name:<24}"
+              f"{args.entries / encode_time[name]:>13,.0f} entries/s"
+              f"{args.entries / (build_time + encode_time[name]):>15,.0f} entries/s"
+              f"{size[name] / 1024 / 1024:>8.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
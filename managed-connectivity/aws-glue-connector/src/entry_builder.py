@@ -2,6 +2,9 @@ import re
 from src.constants import *
 import src.name_builder as nb
 
+# Shared between connectors, see managed-connectivity/src/shared
+from serialization import import_item
+
 def choose_metadata_type(data_type: str):
     """Choose the metadata type based on AWS Glue native type."""
     data_type = data_type.lower()
@@ -37,11 +40,7 @@ def build_database_entry(config, db_name):
         "entry_type": full_entry_type,
         "aspects": aspects
     }
-    return {
-        "entry": entry,
-        "aspect_keys": [DATABASE_ASPECT_KEY],
-        "update_mask": "aspects"
-    }
+    return import_item(entry, [DATABASE_ASPECT_KEY], "aspects")
 
 def build_dataset_entry(config, db_name, table_info, job_lineage):
     """Builds a table or view entry, mimicking the successful Oracle format."""
@@ -99,7 +98,7 @@ def build_dataset_entry(config, db_name, table_info, job_lineage):
                     "links": [{
                         "source": { "fully_qualified_name": nb.create_fqn(config, EntryType.TABLE, db_name, src) },
                         "target": { "fully_qualified_name": nb.create_fqn(config, entry_type, db_name, table_name) }
-                    } for src in set(source_assets)]
+                    } for src in sorted(set(source_assets))]
                 }
             }
         }
@@ -121,8 +120,4 @@ def build_dataset_entry(config, db_name, table_info, job_lineage):
         "aspects": aspects
     }
 
-    return {
-        "entry": entry,
-        "aspect_keys": list(set(aspect_keys)),
-        "update_mask": "aspects"
-    }
\ No newline at end of file
+    return import_item(entry, sorted(set(aspect_keys)), "aspects")
\ No newline at end of file
@@ -1,34 +1,54 @@
-import json
-import os
-from google.cloud import storage
+# Shared between connectors, see managed-connectivity/src/shared
+from output_sink import create_sink
+from serialization import dumps
+from sharded_writer import ShardedJsonlWriter, manifest_path
 
 class GCSUploader:
     def __init__(self, project_id: str, bucket_name: str):
-        self.client = storage.Client(project=project_id)
-        self.bucket = self.client.bucket(bucket_name)
+        # A file:// or memory:// bucket name writes locally, e.g. in tests
+        self.sink = create_sink(bucket_name, project=project_id)
 
-    def upload_entries(self, entries: list, aws_region: str, output_folder: str = None):
+    def read_text(self, blob_name: str):
+        """Reads a small text file from the bucket, None if it doesn't exist."""
+        return self.sink.read_text(blob_name)
+
+    def write_text(self, blob_name: str, content: str):
+        """Writes a small text file to the bucket."""
+        self.sink.write_text(blob_name, content)
+
+    def upload_entries(self, entries: list, aws_region: str, output_folder: str = None,
+                       max_entries: int = None, max_bytes: int = None):
         """
-        Converts a list of dictionary entries to a JSONL file and uploads it to GCS,
-        optionally within a specified folder.
+        Writes a list of dictionary entries as JSONL files to GCS, optionally
+        within a specified folder. A new file is started at the size limits,
+        and a manifest of the files is written next to the folder.
         """
         if not entries:
             print("No entries to upload.")
-            return
+            return None
 
-        # Define the output file name
-        file_name = f"aws-glue-output-{aws_region}.jsonl"
-        
-        # Convert list of entries to a JSONL formatted string
-        content = "\n".join(json.dumps(entry) for entry in entries)
+        # Define the prefix of the output file names
+        file_prefix = f"aws-glue-output-{aws_region}"
 
-        # If an output folder is provided, create the full destination path
+        # Shards are always written to a folder, so the manifest next to it
+        # isn't read as import items. Without an output folder, they go to a
+        # folder named after the prefix instead of the root of the bucket
         if output_folder:
-            blob_name = os.path.join(output_folder, file_name)
+            folder = output_folder
         else:
-            blob_name = file_name
-            
-        blob = self.bucket.blob(blob_name)
-        blob.upload_from_string(content)
-        
-        # The final print statement is now in bootstrap.py for better context
\ No newline at end of file
+            folder = file_prefix
+
+        # Shards are streamed straight to the blobs, without local files
+        writer = ShardedJsonlWriter(
+            self.sink.opener(folder),
+            file_prefix, max_entries=max_entries, max_bytes=max_bytes)
+        with writer:
+            writer.write_all(dumps(entry) for entry in entries)
+
+        self.sink.verify(folder, writer.shards)
+
+        # The manifest is written last, so it only lists uploaded shards
+        self.write_text(manifest_path(folder), writer.manifest_json())
+
+        # The final print statement is now in bootstrap.py for better context
+        return writer.manifest()
@@ -6,6 +6,9 @@ REGION=us-central1
 
 REPO_IMAGE=${REGION}-docker.pkg.dev/${PROJECT}/docker-repo/dataplex-oracle-pyspark
 
+# Stage the modules shared between connectors into the build context
+rm -rf shared && cp -r ../src/shared shared
+
 docker build -t "${IMAGE}" .
 
 # Tag and push to GCP container registry
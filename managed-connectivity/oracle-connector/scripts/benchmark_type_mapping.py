@@ -0,0 +1,93 @@
+"""Microbenchmark of the mappings of native types to metadata types.
+
+Maps the DATA_TYPE column of synthetic column rows with the per-row Python
+UDF, the vectorized pandas UDF, both with the same rules, and the native
+column expression of the default mapping. Rows are generated by Spark and
+the results are written to the noop sink, so only the mapping is timed.
+
+Usage, from the oracle-connector folder:
+    python scripts/benchmark_type_mapping.py --rows 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+CONNECTOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, CONNECTOR_DIR)
+sys.path.insert(1, os.path.join(CONNECTOR_DIR, '..', 'src', 'shared'))
+
+import pyspark.sql.functions as F
+from pyspark.sql import SparkSession
+from pyspark.sql.types import StringType
+
+import type_mapping
+from src.constants import METADATA_TYPE_RULES
+from src.entry_builder import choose_metadata_type
+
+# Native types of a typical catalog, repeated in this order
+DATA_TYPES = ["NUMBER", "VARCHAR2", "DATE", "NUMBER(10,2)", "CHAR",
+              "TIMESTAMP(6)", "CLOB", "NVARCHAR2", "FLOAT", "BLOB", "RAW",
+              "TIMESTAMP(6) WITH TIME ZONE", "INTEGER", "XMLTYPE", "ROWID"]
+
+
+def synthetic_columns(spark, count: int, partitions: int):
+    """Creates a dataframe with the DATA_TYPE column of column rows."""
+    data_types = F.array([F.lit(data_type) for data_type in DATA_TYPES])
+    return spark.range(0, count, numPartitions=partitions) \
+        .select(F.element_at(data_types,
+                             (F.col("id") % len(DATA_TYPES) + 1).cast("int"))
+                .alias("DATA_TYPE"))
+
+
+def run(df, mapping) -> float:
+    """Maps every row and returns the seconds it took."""
+    start = time.perf_counter()
+    df.select(mapping(F.col("DATA_TYPE")).alias("metadataType")) \
+        .write.format("noop").mode("overwrite").save()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000,
+                        help="Number of column rows")
+    parser.add_argument("--partitions", type=int, default=8,
+                        help="Number of partitions of the rows")
+    parser.add_argument("--type_rules", type=str, required=False,
+                        help="JSON file with [regex, metadata type] rules "
+                             "of the UDFs instead of the built-in ones")
+    args = parser.parse_args()
+
+    spark = SparkSession.builder.appName("BenchmarkTypeMapping") \
+        .config("spark.ui.showConsoleProgress", "false").getOrCreate()
+    spark.sparkContext.setLogLevel("ERROR")
+    rules = type_mapping.load_type_rules(vars(args), METADATA_TYPE_RULES)
+    mappings = {
+        "per-row UDF": F.udf(type_mapping.create_metadata_type_mapping(rules),
+                             StringType()),
+        "pandas UDF": type_mapping.create_metadata_type_pandas_udf(rules),
+        "native expression": choose_metadata_type,
+    }
+
+    # All mappings agree on every type with the built-in rules
+    df_types = spark.createDataFrame([(data_type,) for data_type in DATA_TYPES],
+                                     "DATA_TYPE string")
+    results = {name: [row[0] for row in df_types.select(
+                   mapping(F.col("DATA_TYPE"))).collect()]
+               for name, mapping in mappings.items()}
+    if not args.type_rules and len({tuple(types) for types in results.values()}) != 1:
+        sys.exit(f"Mappings differ: {results}")
+
+    df = synthetic_columns(spark, args.rows, args.partitions).cache()
+    df.count()
+    print(f"{args.rows:,} column rows, {args.partitions} partitions, "
+          f"{len(rules)} rules")
+    for name, mapping in mappings.items():
+        seconds = run(df, mapping)
+        print(f"{name:<20}{seconds:>8.1f} s{args.rows / seconds:>15,.0f} rows/s")
+    spark.stop()
+
+
+if __name__ == '__main__':
+    main()
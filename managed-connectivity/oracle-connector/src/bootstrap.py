@@ -1,9 +1,20 @@
 """The entrypoint of a pipeline."""
-from typing import Dict
+import json
+import os
+import resource
+import tempfile
+from functools import lru_cache
+from typing import Dict, List
 import sys
+import threading
+import time
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+import google_crc32c
+from pyspark.accumulators import AccumulatorParam
+
 from src.constants import EntryType
 from src.constants import SOURCE_TYPE
 from src import cmd_reader
@@ -11,17 +22,27 @@ from src import secret_manager
 from src import entry_builder
 from src import gcs_uploader
 from src import top_entry_builder
+from src import row_builder
+from src import name_builder as nb
+from src import oracle_queries as queries
 from src.oracle_connector import OracleConnector
+from src.oracledb_connector import OracledbConnector
+from src.snapshot_connector import SnapshotConnector
+
+# Shared between connectors, see managed-connectivity/src/shared
+import checkpoint
+import sharded_writer
 
-def write_jsonl(output_file, json_strings):
-    """Writes a list of string to the file in JSONL format."""
+# Output shards are flushed to the disk in large blocks
+OUTPUT_BUFFER_SIZE = 1024 * 1024
 
-    # For simplicity, dataset is written into the one file. But it is not
-    # mandatory, and the order doesn't matter for Import API.
-    # The PySpark itself could dump entries into many smaller JSONL files.
-    # Due to performance, it's recommended to dump to many smaller files.
-    for string in json_strings:
-        output_file.write(string + "\n")
+# Keys of a source in the sources file
+SOURCE_KEYS = ("name", "host", "port", "service", "sid", "user",
+               "password_secret", "max_in_flight",
+               "standby_host", "standby_port", "standby_service")
+# Keys of a source which are not taken from the command line
+DATABASE_KEYS = ("service", "sid",
+                 "standby_host", "standby_port", "standby_service")
 
 
 def process_dataset(
@@ -29,17 +50,629 @@ def process_dataset(
     config: Dict[str, str],
     schema_name: str,
     entry_type: EntryType,
+    since: str = "",
 ):
-    """Builds dataset and converts it to jsonl."""
-    df_raw = connector.get_dataset(schema_name, entry_type)
-    df = entry_builder.build_dataset(config, df_raw, schema_name, entry_type)
-    return df.toJSON().collect()
+    """Builds dataset of tables or views in the schema."""
+    df_raw = connector.get_dataset(schema_name, entry_type, since)
+    return entry_builder.build_dataset(config, df_raw, schema_name, entry_type)
+
+
+def process_all_datasets(connector: OracleConnector, config: Dict[str, str],
+                         watermarks: Dict[str, str] = None,
+                         containers: List[str] = None):
+    """Builds dataset of tables and views of all schemas, or of all
+    pluggable databases if their containers are given."""
+    if containers is not None:
+        df_raw = connector.get_cdb_datasets()
+        return entry_builder.build_cdb_datasets(config, df_raw, containers)
+    df_raw = connector.get_all_datasets(watermarks)
+    return entry_builder.build_datasets(config, df_raw)
+
+
+def iter_datasets(connector: OracleConnector, config: Dict[str, str],
+                  schemas: List[str], watermarks: Dict[str, str] = None,
+                  containers: List[str] = None):
+    """Yields datasets with tables and views according to extract mode.
+    Args:
+        watermarks - DDL watermarks of the previous run per schema,
+                     if only the changed objects have to be extracted
+        containers - pluggable databases in the CDB mode
+    """
+    watermarks = watermarks or {}
+    if config["extract_mode"] == "bulk":
+        # Ingest tables and views of all schemas with one query
+        print(f"Processing tables and views for {len(schemas)} schemas")
+        yield process_all_datasets(connector, config, watermarks, containers)
+        return
+
+    # Ingest tables and views for every schema in a list
+    for schema in schemas:
+        since = watermarks.get(schema, "")
+        print(f"Processing tables for {schema}")
+        yield process_dataset(connector, config, schema, EntryType.TABLE, since)
+        print(f"Processing views for {schema}")
+        yield process_dataset(connector, config, schema, EntryType.VIEW, since)
+
+
+def iter_row_datasets(connector: OracledbConnector, config: Dict[str, str],
+                      schemas: List[str], watermarks: Dict[str, str] = None,
+                      containers: List[str] = None):
+    """Yields JSON lines of tables and views according to extract mode,
+    built from the rows of python-oracledb without Spark."""
+    watermarks = watermarks or {}
+    if containers is not None:
+        print(f"Processing tables and views for {len(schemas)} schemas "
+              f"of {len(containers)} pluggable databases")
+        yield from row_builder.build_cdb_datasets(
+            config, connector.get_cdb_datasets())
+        return
+    if config["extract_mode"] == "bulk":
+        print(f"Processing tables and views for {len(schemas)} schemas")
+        yield from row_builder.build_datasets(
+            config, connector.get_all_datasets(watermarks))
+        return
+
+    for schema in schemas:
+        since = watermarks.get(schema, "")
+        for entry_type in [EntryType.TABLE, EntryType.VIEW]:
+            print(f"Processing {entry_type.name.lower()}s for {schema}")
+            rows = connector.get_dataset(schema, entry_type, since)
+            yield from row_builder.build_dataset(config, rows, schema, entry_type)
+
+
+def load_watermarks(config: Dict[str, str], state_path: str):
+    """Loads DDL watermarks saved by the previous incremental run."""
+    state = gcs_uploader.read_text(config, state_path)
+    if state is None:
+        print("No previous watermarks found, extracting all objects")
+        return {}
+    return json.loads(state)
+
+
+def changed_schemas(schemas: List[str], watermarks: Dict[str, str],
+                    new_watermarks: Dict[str, str]):
+    """Selects schemas with tables or views changed since the watermarks."""
+    # Timestamps are formatted the same way, so they are compared as text
+    return [schema for schema in schemas
+            if schema in new_watermarks
+            and new_watermarks[schema] > watermarks.get(schema, "")]
+
+
+@lru_cache(maxsize=None)
+def local_dir() -> str:
+    """Gets the temporary folder of the local shards, created once per run."""
+    return tempfile.mkdtemp(prefix=f"{SOURCE_TYPE}-output-")
+
+
+def shard_opener(config: Dict[str, str], folder: str):
+    """Gets a function opening shards for writing.
+
+    Shards are streamed to the GCS folder or buffered in local files, which
+    are uploaded when the extraction ends.
+    """
+    if config["stream_to_gcs"]:
+        opener = gcs_uploader.opener(config, folder)
+    else:
+        opener = lambda name: open(os.path.join(local_dir(), name), "wb",
+                                   buffering=OUTPUT_BUFFER_SIZE)
+    if config["compress"]:
+        opener = sharded_writer.gzip_opener(opener)
+    return opener
+
+
+def create_writer(config: Dict[str, str], folder: str, prefix: str):
+    """Creates a writer of shards with names starting with the prefix."""
+    return sharded_writer.ShardedJsonlWriter(
+        shard_opener(config, folder), prefix,
+        max_entries=config["max_shard_entries"],
+        max_bytes=config["max_shard_bytes"],
+        suffix=".jsonl.gz" if config["compress"] else ".jsonl")
+
+
+def publish_shards(config: Dict[str, str], shards: List[Dict], folder: str):
+    """Uploads the local shards to the folder, or verifies streamed ones."""
+    if not config["stream_to_gcs"]:
+        filenames = [os.path.join(local_dir(), shard["name"]) for shard in shards]
+        gcs_uploader.upload_many(config, filenames, folder)
+        # Uploaded files are removed, so a run over many schemas doesn't
+        # fill the local disk
+        for filename in filenames:
+            os.remove(filename)
+    elif not config["compress"]:
+        # Checksums of the manifest are of the content before gzip
+        gcs_uploader.verify_shards(config, shards, folder)
+
+
+def stream_jsonl(writer: sharded_writer.ShardedJsonlWriter, df) -> int:
+    """Writes a DataFrame in JSONL format one partition at a time."""
+    # Only one partition (and the next prefetched one) is held in driver
+    # memory at a time, instead of the whole dataset as collect() does
+    return writer.write_all(
+        df.toJSON().toLocalIterator(prefetchPartitions=True))
+
+
+def collect_datasets(connector: OracleConnector, config: Dict[str, str],
+                     schemas: List[str], watermarks: Dict[str, str] = None,
+                     containers: List[str] = None):
+    """Yields datasets collected to jsonl, up to max_in_flight concurrently."""
+    max_in_flight = config.get("max_in_flight") or 1
+    if config["extract_mode"] == "bulk" or max_in_flight < 2:
+        for df in iter_datasets(connector, config, schemas, watermarks,
+                                containers):
+            yield df.toJSON().collect()
+        return
+
+    watermarks = watermarks or {}
+
+    def collect(schema: str, entry_type: EntryType):
+        if config.get("fair_scheduler"):
+            # Every worker thread submits its jobs to own pool, so they
+            # share the executors instead of queueing one after another
+            connector.set_scheduler_pool(threading.current_thread().name)
+        print(f"Processing {entry_type.name.lower()}s for {schema}")
+        df = process_dataset(connector, config, schema, entry_type,
+                             watermarks.get(schema, ""))
+        return df.toJSON().collect()
+
+    # Spark accepts jobs from many threads. The pool size bounds the number
+    # of concurrent queries, so the source database is not overwhelmed.
+    with ThreadPoolExecutor(max_workers=max_in_flight,
+                            thread_name_prefix="schema") as executor:
+        futures = [executor.submit(collect, schema, entry_type)
+                   for schema in schemas
+                   for entry_type in [EntryType.TABLE, EntryType.VIEW]]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def iter_schema_datasets(connector: OracleConnector, config: Dict[str, str],
+                         schemas: List[str], watermarks: Dict[str, str] = None):
+    """Yields schemas with JSON lines of their tables and views, in the
+    order the schemas are completed, up to max_in_flight concurrently."""
+    watermarks = watermarks or {}
+
+    def lines(schema: str):
+        since = watermarks.get(schema, "")
+        for entry_type in [EntryType.TABLE, EntryType.VIEW]:
+            print(f"Processing {entry_type.name.lower()}s for {schema}")
+            if config["engine"] == "oracledb":
+                rows = connector.get_dataset(schema, entry_type, since)
+                yield from row_builder.build_dataset(config, rows, schema, entry_type)
+                continue
+            df = process_dataset(connector, config, schema, entry_type, since)
+            if config["write_mode"] == "stream":
+                yield from df.toJSON().toLocalIterator(prefetchPartitions=True)
+            else:
+                yield from df.toJSON().collect()
+
+    max_in_flight = config.get("max_in_flight") or 1
+    if config["engine"] == "oracledb" or config["write_mode"] == "stream" \
+            or max_in_flight < 2:
+        for schema in schemas:
+            yield schema, lines(schema)
+        return
+
+    def collect(schema: str):
+        if config.get("fair_scheduler"):
+            connector.set_scheduler_pool(threading.current_thread().name)
+        return list(lines(schema))
+
+    with ThreadPoolExecutor(max_workers=max_in_flight,
+                            thread_name_prefix="schema") as executor:
+        futures = {executor.submit(collect, schema): schema for schema in schemas}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def write_checkpointed(connector: OracleConnector, config: Dict[str, str],
+                       folder: str, filename: str, top_lines: List[str],
+                       schemas: List[str], watermarks: Dict[str, str] = None):
+    """Writes the top entries and every schema to own shards, and records
+    the progress after each of them, so a resumed run skips them.
+    Returns:
+        Checkpoint with the shards of all the parts.
+    """
+    path = checkpoint.progress_path(folder)
+    progress = checkpoint.Checkpoint.loads(gcs_uploader.read_text(config, path))
+
+    def write_part(prefix: str, lines) -> List[Dict]:
+        with create_writer(config, folder, prefix) as writer:
+            writer.write_all(lines)
+        publish_shards(config, writer.shards, folder)
+        return writer.shards
+
+    if progress.top_completed:
+        print("Top entries and schemas are already written")
+    else:
+        progress.complete_top(write_part(filename, top_lines))
+        gcs_uploader.write_text(config, path, progress.dumps())
+
+    pending = progress.pending(schemas)
+    print(f"{len(schemas) - len(pending)} schemas are already written, "
+          f"{len(pending)} left")
+    for schema, lines in iter_schema_datasets(connector, config, pending, watermarks):
+        shards = write_part(checkpoint.shard_prefix(filename, schema), lines)
+        progress.complete_schema(schema, shards)
+        gcs_uploader.write_text(config, path, progress.dumps())
+    return progress
+
+
+class ShardsParam(AccumulatorParam):
+    """Accumulates the shards of the part files by their partitions, so a
+    partition written again by a retried or speculative task is counted
+    once."""
+
+    def zero(self, value):
+        return {}
+
+    def addInPlace(self, shards, other):
+        shards.update(other)
+        return shards
+
+
+def write_distributed(output_uri: str, top_entries: List[str], datasets):
+    """Writes datasets as many JSONL files directly from the executors.
+    Returns:
+        Shards of the part files, the same as ShardedJsonlWriter describes
+        the shards it writes.
+    """
+    rdds = [df.toJSON() for df in datasets]
+    context = rdds[0].context
+    written = context.accumulator({}, ShardsParam())
+
+    def describe(index, lines):
+        # Lines are described while written, so datasets are not evaluated
+        # twice. Every part file is named after its partition
+        shard = {"name": f"part-{index:05d}", "entries": 0, "bytes": 0}
+        checksum = google_crc32c.Checksum()
+        for line in lines:
+            data = (line + "\n").encode("utf-8")
+            shard["entries"] += 1
+            shard["bytes"] += len(data)
+            checksum.update(data)
+            yield line
+        shard["crc32c"] = sharded_writer.encode_crc32c(checksum)
+        written.add({index: shard})
+
+    # Top entries are merged in as a tiny extra shard
+    top_rdd = context.parallelize(top_entries, 1)
+    context.union([top_rdd] + rdds).mapPartitionsWithIndex(describe) \
+        .saveAsTextFile(output_uri)
+    return [written.value[index] for index in sorted(written.value)]
+
+
+def extract(connector: OracleConnector, config: Dict[str, str], folder: str,
+            filename: str, checkpointed: bool = False):
+    """Extracts the entries of one database to shards in the output folder.
+    Args:
+        filename - prefix of the shards of the database
+    Returns:
+        Uploaded shards.
+    """
+    extract_start = time.monotonic()
+
+    containers = None
+    if config["cdb"]:
+        if config["engine"] == "oracledb":
+            containers = connector.get_containers()
+        else:
+            containers = [row.PDB_NAME for row in connector.get_containers().collect()]
+        if not containers:
+            print("No pluggable databases found in the CDB")
+            return []
+        print(f"{len(containers)} pluggable databases found in the CDB")
+        # Every pluggable database is a database of the instance
+        top_entries = [top_entry_builder.create(config, EntryType.INSTANCE)] + [
+            top_entry_builder.create(nb.container_config(config, container),
+                                     EntryType.DATABASE)
+            for container in containers]
+    else:
+        # Top entries don't require connection to the database
+        top_entries = [top_entry_builder.create(config, EntryType.INSTANCE),
+                       top_entry_builder.create(config, EntryType.DATABASE)]
+
+    # Get schemas and collect them to the list
+    if config["cdb"] and config["engine"] == "oracledb":
+        rows = list(connector.get_cdb_schemas())
+        schemas = [schema for _, schema in rows]
+        schemas_json = list(row_builder.build_cdb_schemas(config, rows))
+    elif config["cdb"]:
+        df_raw_schemas = connector.get_cdb_schemas()
+        schemas = [schema.USERNAME for schema in df_raw_schemas.select("USERNAME").collect()]
+        df_schemas = entry_builder.build_cdb_schemas(config, df_raw_schemas, containers)
+    elif config["engine"] == "oracledb":
+        schemas = connector.get_db_schemas()
+        schemas_json = list(row_builder.build_schemas(config, schemas))
+    else:
+        # The list and the entries are built from one snapshot of the result
+        df_raw_schemas = connector.get_db_schemas()
+        schemas = [schema.USERNAME for schema in df_raw_schemas.select("USERNAME").collect()]
+        df_schemas = entry_builder.build_schemas(config, df_raw_schemas)
+
+    watermarks = None
+    if config["incremental"]:
+        # Watermarks are taken before the extraction, so objects changed
+        # while the connector runs are picked up by the next run
+        state_path = f"{SOURCE_TYPE}/state/{filename}-watermarks.json"
+        watermarks = load_watermarks(config, state_path)
+        if config["engine"] == "oracledb":
+            new_watermarks = connector.get_ddl_watermarks()
+        else:
+            new_watermarks = {row.OWNER: row.LAST_DDL_TIME
+                              for row in connector.get_ddl_watermarks().collect()}
+        schemas = changed_schemas(schemas, watermarks, new_watermarks)
+        print(f"{len(schemas)} schemas changed since the previous run")
+
+    if checkpointed:
+        if config["engine"] != "oracledb":
+            schemas_json = df_schemas.toJSON().collect()
+        progress = write_checkpointed(connector, config, folder, filename,
+                                      top_entries + schemas_json, schemas,
+                                      watermarks)
+        print_summary(connector, progress.manifest()["entries"], extract_start,
+                      f"{len(progress.shards)} files")
+        shards = progress.shards
+    elif config["write_mode"] == "distributed":
+        output_uri = gcs_uploader.output_uri(config, folder)
+        print(f"Writing entries to {output_uri}")
+        datasets = [df_schemas,
+                    *iter_datasets(connector, config, schemas, watermarks,
+                                   containers)]
+        shards = write_distributed(output_uri, top_entries, datasets)
+        print_summary(connector, sum(shard["entries"] for shard in shards),
+                      extract_start, f"{len(shards)} files in {output_uri}")
+        # Part files are not compressed, so they match their checksums
+        gcs_uploader.verify_shards(config, shards, folder)
+    else:
+        writer = create_writer(config, folder, filename)
+        with writer:
+            writer.write_all(top_entries)
+            if config["engine"] == "oracledb":
+                # Rows are streamed from the cursor in batches of fetch_size
+                writer.write_all(schemas_json)
+                writer.write_all(iter_row_datasets(connector, config, schemas,
+                                                   watermarks, containers))
+            elif config["write_mode"] == "stream":
+                stream_jsonl(writer, df_schemas)
+                for df in iter_datasets(connector, config, schemas, watermarks,
+                                        containers):
+                    stream_jsonl(writer, df)
+            else:
+                writer.write_all(df_schemas.toJSON().collect())
+                for datasets_json in collect_datasets(connector, config, schemas,
+                                                      watermarks, containers):
+                    writer.write_all(datasets_json)
+
+        print_summary(connector, writer.entries_count, extract_start,
+                      f"{len(writer.shards)} files")
+        publish_shards(config, writer.shards, folder)
+        shards = writer.shards
+
+    if config["incremental"]:
+        # Saved only when the output is written, so a failed run is repeated
+        gcs_uploader.write_text(config, state_path,
+                                json.dumps({**watermarks, **new_watermarks}))
+    return shards
+
+
+def extract_with_fallback(connector: OracleConnector, config: Dict[str, str],
+                          folder: str, filename: str, checkpointed: bool = False):
+    """Extracts the entries of one database, and extracts them again from
+    the primary if the standby fails while the rows are read.
+
+    A read which fails on the standby when it's started is sent to the
+    primary by the connector. The rows of a read which fails later are
+    partly written already, so the extraction is repeated, or resumed from
+    its checkpoint. Entries which were uploaded by the distributed write
+    mode or streamed to GCS can't be taken back, so then the run fails.
+    """
+    try:
+        return extract(connector, config, folder, filename, checkpointed)
+    except Exception as ex:
+        if config["write_mode"] == "distributed" or config["stream_to_gcs"] \
+                or not connector.fail_over():
+            raise
+        print(f"Standby failed while rows were read, extracting again "
+              f"from the primary: {str(ex).splitlines()[0]}")
+    return extract(connector, config, folder, filename, checkpointed)
+
+
+def write_manifest(config: Dict[str, str], folder: str, shards: List[Dict],
+                   **details):
+    """Writes the manifest of the shards of one or many databases next to
+    the folder, the same way as ShardedJsonlWriter.manifest() describes
+    the shards of one writer."""
+    manifest = {
+        "entries": sum(shard["entries"] for shard in shards),
+        "bytes": sum(shard["bytes"] for shard in shards),
+        "shards": shards,
+        **details,
+    }
+    gcs_uploader.write_text(config, sharded_writer.manifest_path(folder),
+                            json.dumps(manifest, indent=2))
+
+
+def create_connector(config: Dict[str, str]):
+    """Connects to the database of the config with the engine of the run."""
+    if config["engine"] == "oracledb":
+        # No SparkSession is created, so no JVM is started
+        return OracledbConnector(config)
+    return OracleConnector(config)
+
+
+def load_sources(config: Dict[str, str]) -> List[Dict[str, str]]:
+    """Reads the sources file, and gets the config of every source.
+
+    Keys of a source override the arguments of the run, so a source
+    without own user or max_in_flight takes them from the command line.
+    """
+    with open(config["sources_file"], encoding="utf-8") as file:
+        sources = json.load(file)
+
+    source_configs = []
+    for source in sources:
+        unknown = set(source) - set(SOURCE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown keys {sorted(unknown)} of source {source}")
+        if bool(source.get("service")) == bool(source.get("sid")):
+            raise ValueError(f"Either service or sid is required in source {source}")
+        source_config = {**config, **dict.fromkeys(DATABASE_KEYS), **source}
+        missing = [key for key in ["host", "port", "user", "password_secret"]
+                   if not source_config.get(key)]
+        if missing:
+            raise ValueError(f"Missing {missing} of source {source}")
+        source_config["name"] = source.get("name") or \
+            f"{source['host']}-{source.get('service') or source.get('sid')}"
+        if config["snapshot"] == "parquet":
+            # Snapshots of the sources are saved side by side
+            source_config["snapshot_dir"] = checkpoint.shard_prefix(
+                f"{config['snapshot_dir'].rstrip('/')}/source", source_config["name"])
+        source_configs.append(source_config)
+
+    names = [source_config["name"] for source_config in source_configs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Names of sources {duplicates} are not unique")
+    return source_configs
+
+
+def run_sources(sources: List[Dict[str, str]], config: Dict[str, str],
+                folder: str):
+    """Extracts the databases of the sources file in one process, up to
+    max_sources_in_flight concurrently, each to its own shards.
+
+    The Spark engine shares one SparkSession and the secret client
+    between all the sources. A source which fails is recorded in the
+    manifest, and the others are extracted anyway.
+    Returns:
+        Names of the sources which failed.
+    """
+    def run_source(source: Dict[str, str]) -> List[Dict]:
+        print(f"Extracting source {source['name']}")
+        source["password"] = secret_manager.get_password(source["password_secret"])
+        connector = create_connector(source)
+        if config["engine"] != "oracledb" and config.get("fair_scheduler"):
+            # Sources share the executors instead of queueing one after another
+            connector.set_scheduler_pool(f"source-{source['name']}")
+        filename = checkpoint.shard_prefix(f"{SOURCE_TYPE}-output", source["name"])
+        try:
+            return extract_with_fallback(connector, source, folder, filename)
+        finally:
+            # Cached results of a source are not kept for the next sources
+            connector.close()
+
+    shards = []
+    summary = {}
+    with ThreadPoolExecutor(max_workers=config["max_sources_in_flight"],
+                            thread_name_prefix="source") as executor:
+        futures = {executor.submit(run_source, source): source["name"]
+                   for source in sources}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                source_shards = future.result()
+            except Exception as ex:
+                print(f"Source {name} failed: {ex}")
+                summary[name] = {"error": str(ex)}
+                continue
+            shards.extend(source_shards)
+            summary[name] = {
+                "entries": sum(shard["entries"] for shard in source_shards),
+                "files": [shard["name"] for shard in source_shards],
+            }
+
+    failed = sorted(name for name in summary if "error" in summary[name])
+    print(f"{len(sources) - len(failed)} sources extracted, {len(failed)} failed")
+    # The manifest is written last, so it only lists uploaded shards
+    write_manifest(config, folder, shards,
+                   sources={name: summary[name] for name in sorted(summary)})
+    return failed
+
+
+def benchmark_views(connector: OracleConnector):
+    """Times the column query of all schemas with every strategy of the
+    dictionary views the user can read, and prints the fastest one."""
+    timings = {}
+    for views, view in queries.COLUMN_VIEWS.items():
+        if not connector.can_read(view):
+            continue
+        print(f"Reading all columns from {view}")
+        timings[views] = connector.time_query(queries.all_columns(views=views))
+        print(f"{view}: {timings[views]:.1f}s")
+    best = min(timings, key=timings.get)
+    print(f"Recommended: --dictionary_views {best}")
+
+
+def print_summary(connector: OracleConnector, rows_count: int,
+                  extract_start: float, destination: str):
+    """Prints the statistics of the run."""
+    extract_seconds = time.monotonic() - extract_start
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{rows_count} rows written to {destination}, "
+          f"driver peak RSS {peak_rss_mb:.0f} MB")
+    queries_count = connector.queries_count
+    if not connector.queries_exact:
+        queries_count = f"at least {queries_count}"
+    print(f"Extracted in {extract_seconds:.1f}s with {queries_count} "
+          f"source queries and read options {connector.tuning_options()}")
+    if connector.served_by:
+        served_by = ", ".join(f"{count} by the {node}"
+                              for node, count in sorted(connector.served_by.items()))
+        print(f"Reads served {served_by}")
+    if connector.repeated_reads:
+        print(f"{connector.repeated_reads} reads of the standby were "
+              f"repeated on the primary after it failed")
 
 
 def run():
     """Runs a pipeline."""
     config = cmd_reader.read_args()
 
+    if config["engine"] == "oracledb" and config["write_mode"] == "distributed":
+        print("The distributed write mode requires the spark engine")
+        print("Exiting")
+        sys.exit()
+
+    if config["from_snapshot"] and (config["engine"] == "oracledb" or config["incremental"]):
+        print("Snapshots are replayed by the spark engine, without the incremental mode")
+        print("Exiting")
+        sys.exit()
+
+    checkpointed = config["checkpoint"] or bool(config["resume"])
+    if checkpointed and (config["write_mode"] == "distributed"
+                         or config["extract_mode"] == "bulk"):
+        print("Checkpoints require the schema extract mode and the driver "
+              "or stream write mode")
+        print("Exiting")
+        sys.exit()
+
+    if config["cdb"] and (config["incremental"] or checkpointed
+                          or config["from_snapshot"]):
+        print("The CDB mode extracts all pluggable databases in one pass, "
+              "without the incremental, checkpoint or snapshot replay modes")
+        print("Exiting")
+        sys.exit()
+
+    if config["cdb"] and config["extract_mode"] != "bulk":
+        # Every dictionary view of the whole CDB is read with one query
+        print("The CDB mode reads tables and views in the bulk extract mode")
+        config["extract_mode"] = "bulk"
+
+    if config["sources_file"] and (checkpointed or config["from_snapshot"]
+                                   or config["benchmark_views"]
+                                   or config["write_mode"] == "distributed"):
+        print("Sources are extracted in the driver or stream write mode, "
+              "without the checkpoint, snapshot replay or benchmark modes")
+        print("Exiting")
+        sys.exit()
+
+    if config["benchmark_views"] and config["from_snapshot"]:
+        print("Dictionary views are benchmarked against the database, "
+              "not a snapshot")
+        print("Exiting")
+        sys.exit()
+
     if not gcs_uploader.checkDestination(config):
         print("Exiting")
         sys.exit()
@@ -50,19 +683,43 @@ def run():
     """Build the default output filename"""
     FILENAME = SOURCE_TYPE + "-output.jsonl"
 
+    if config["resume"]:
+        # Output of the failed run is completed in its own folder
+        FOLDERNAME = config["resume"].rstrip("/")
+
     print(f"output folder is {config['output_bucket']} {FOLDERNAME}")
 
-    try:
-        config["password"] = secret_manager.get_password(config["password_secret"])
-    except Exception as ex:
-        print(ex)
-        print("Exiting")
-        sys.exit()
+    if config["sources_file"]:
+        try:
+            sources = load_sources(config)
+        except (OSError, ValueError) as ex:
+            print(ex)
+            print("Exiting")
+            sys.exit()
+        print(f"{len(sources)} sources read from {config['sources_file']}")
+        if run_sources(sources, config, FOLDERNAME):
+            # Entries of the failed sources are missing in the output, so a
+            # full import of the folder would delete them from the catalog
+            sys.exit(1)
+        return
+
+    if config["from_snapshot"]:
+        # Neither the database nor its password is needed
+        connector = SnapshotConnector(config)
+    else:
+        try:
+            config["password"] = secret_manager.get_password(config["password_secret"])
+        except Exception as ex:
+            print(ex)
+            print("Exiting")
+            sys.exit()
 
-    connector = OracleConnector(config)
-    schemas_count = 0
-    entries_count = 0
+        connector = create_connector(config)
 
+        if config["benchmark_views"]:
+            benchmark_views(connector)
+            connector.close()
+            return
 
     # Build the output file name from connection details
     if config['sid'] and len(config['sid']) > 0:
@@ -70,31 +727,10 @@ def run():
     else:
         FILENAME = f"oracle-output-{config['service']}"
 
-    with open(FILENAME, "w", encoding="utf-8") as file:
-        # Write top entries that don't require connection to the database
-        file.writelines(top_entry_builder.create(config, EntryType.INSTANCE))
-        file.writelines("\n")
-        file.writelines(top_entry_builder.create(config, EntryType.DATABASE))
-
-        # Get schemas, write them and collect to the list
-        df_raw_schemas = connector.get_db_schemas()
-        schemas = [schema.USERNAME for schema in df_raw_schemas.select("USERNAME").collect()]
-        schemas_json = entry_builder.build_schemas(config, df_raw_schemas).toJSON().collect()
-
-        schemas_count = len(schemas_json)
-
-        write_jsonl(file, schemas_json)
-
-        # Ingest tables and views for every schema in a list
-        for schema in schemas:
-            print(f"Processing tables for {schema}")
-            tables_json = process_dataset(connector, config, schema, EntryType.TABLE)
-            entries_count += len(tables_json)
-            write_jsonl(file, tables_json)
-            print(f"Processing views for {schema}")
-            views_json = process_dataset(connector, config, schema, EntryType.VIEW)
-            entries_count += len(views_json)
-            write_jsonl(file, views_json)
-
-    print(f"{schemas_count + entries_count} rows written to file") 
-    gcs_uploader.upload(config, FILENAME,FOLDERNAME)
+    try:
+        shards = extract_with_fallback(connector, config, FOLDERNAME, FILENAME,
+                                       checkpointed)
+    finally:
+        connector.close()
+    # The manifest is written last, so it only lists uploaded shards
+    write_manifest(config, FOLDERNAME, shards)
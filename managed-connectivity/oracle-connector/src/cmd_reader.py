@@ -19,21 +19,135 @@ def read_args():
              "locations/${target_location_id}/entryGroups/${target_entry_group_id}.")
 
     # Oracle specific arguments
-    parser.add_argument("--host", type=str, required=True,
-        help="The Oracle host server")
-    parser.add_argument("--port", type=str, required=True,
-        help="The port number (usually 1521)")
-    parser.add_argument("--user", type=str, required=True, help="Oracle User")
-    parser.add_argument("--password-secret", type=str, required=True,
-        help="Resource name in the Google Cloud Secret Manager for the Oracle password")
+    parser.add_argument("--host", type=str, required=False,
+        help="The Oracle host server. Required unless --sources_file is given")
+    parser.add_argument("--port", type=str, required=False,
+        help="The port number (usually 1521). Required unless "
+             "--sources_file is given")
+    parser.add_argument("--user", type=str, required=False,
+        help="Oracle User. Required unless --from_snapshot is given")
+    parser.add_argument("--password-secret", type=str, required=False,
+        help="Resource name in the Google Cloud Secret Manager for the Oracle "
+             "password. Required unless --from_snapshot is given")
     #parser.add_argument("--exclude-schemas", type=str,required=False,
     #    help="Additional schemas to be excluded from metadata extract (comma seperated list)")
-    # User must provide either an Oracle SID OR a service name to connect
+    # User must provide either an Oracle SID OR a service name to connect,
+    # unless every source of the sources file has its own
     group = parser.add_argument_group('service_or_sid', 'Oracle Service or SID')
-    exclusive_group = group.add_mutually_exclusive_group(required=True)
+    exclusive_group = group.add_mutually_exclusive_group(required=False)
     exclusive_group.add_argument("--service", type=str, help="Oracle Service name of the database")
     exclusive_group.add_argument("--sid", type=str, help="SID (Service Identifier) of the Oracle database. For older Oracle versions")
  
+    # Standby arguments
+    parser.add_argument("--standby_service", type=str, required=False,
+        help="Service of a Data Guard standby or another read-only copy of "
+             "the database. Dictionary queries are sent to it, unless it's "
+             "down or V$DATABASE shows it's a read write primary, and fall "
+             "back to the primary when they fail on it")
+    parser.add_argument("--standby_host", type=str, required=False,
+        help="Host of the standby service. Default is --host")
+    parser.add_argument("--standby_port", type=str, required=False,
+        help="Port of the standby service. Default is --port")
+
+    # Sources arguments
+    parser.add_argument("--sources_file", type=str, required=False,
+        help="JSON file with a list of databases to extract in one run, "
+             "each with host, port, service or sid, password_secret, and "
+             "optionally name, user and max_in_flight. --user is the default "
+             "user of the sources, other connection arguments are not used")
+    parser.add_argument("--max_sources_in_flight", type=int, required=False,
+        default=4,
+        help="Maximum number of sources of the sources file extracted "
+             "concurrently. Default 4")
+
+    # Extraction arguments
+    parser.add_argument("--extract_mode", type=str, required=False,
+        default="schema", choices=["schema", "bulk"],
+        help="schema: query tables and views one schema at a time. "
+             "bulk: query tables and views of all schemas in a single pass")
+    parser.add_argument("--read_partitions", type=int, required=False, default=1,
+        help="Number of partitions the column queries are split into with "
+             "ORA_HASH, to be read by the Spark executors in parallel")
+    parser.add_argument("--read_predicates", type=str, required=False,
+        help="File with SQL predicates, one per line, to split the column "
+             "queries by instead of ORA_HASH, e.g. OWNER ranges")
+
+    parser.add_argument("--cdb", action="store_true",
+        help="The service or SID is the root container of a multitenant "
+             "CDB. Extract all its pluggable databases in one pass from "
+             "the CDB_ views, each as a database of the instance. Requires "
+             "a common user, e.g. C##DATAPLEX, granted SELECT_CATALOG_ROLE")
+    parser.add_argument("--incremental", action="store_true",
+        help="Extract only tables and views with DDL changed since the "
+             "previous incremental run, based on DBA_OBJECTS.LAST_DDL_TIME")
+
+    parser.add_argument("--max_in_flight", type=int, required=False, default=1,
+        help="Maximum number of schema queries running concurrently in "
+             "schema extract mode. Default 1 processes schemas one by one")
+    parser.add_argument("--fair_scheduler", action="store_true",
+        help="Use Spark FAIR scheduler pools for concurrent schema queries")
+
+    parser.add_argument("--engine", type=str, required=False,
+        default="spark", choices=["spark", "oracledb"],
+        help="spark: read and build entries with PySpark over JDBC. "
+             "oracledb: read with python-oracledb in thin mode and build "
+             "entries in Python, without starting Spark. Faster for "
+             "small and medium catalogs")
+
+    parser.add_argument("--dictionary_views", type=str, required=False,
+        default="auto", choices=["auto", "all", "dba"],
+        help="Dictionary views of the column queries. all: ALL_TAB_COLUMNS, "
+             "which checks privileges on every object. dba: DBA_TAB_COLUMNS, "
+             "usually much faster. auto: DBA_ views if the user can read them")
+    parser.add_argument("--benchmark_views", action="store_true",
+        help="Time the column query of all schemas with every dictionary "
+             "view the user can read, print a recommendation and exit")
+
+    # JDBC read-tuning arguments
+    parser.add_argument("--fetch_size", type=int, required=False, default=10000,
+        help="Number of rows fetched from Oracle per round-trip")
+    parser.add_argument("--query_timeout", type=int, required=False, default=0,
+        help="Timeout of the dictionary queries in seconds. 0 means no limit")
+    parser.add_argument("--session_init_statement", type=str, required=False,
+        help="SQL executed when a session is opened, "
+             "e.g. ALTER SESSION SET OPTIMIZER_MODE = ALL_ROWS")
+    parser.add_argument("--lob_prefetch_size", type=int, required=False,
+        help="Size in bytes of the LOB data prefetched with every row")
+
+    # Snapshot arguments
+    parser.add_argument("--snapshot", type=str, required=False,
+        default="cache", choices=["none", "cache", "parquet"],
+        help="How results of the dictionary queries are materialized, so "
+             "every query runs once. cache: Spark memory and disk, for the "
+             "results read more than once. parquet: Parquet files in "
+             "snapshot_dir. none: not materialized")
+    parser.add_argument("--snapshot_dir", type=str, required=False,
+        default="snapshot",
+        help="Folder of the Parquet snapshots. Local, unless a scheme like "
+             "gs:// is given")
+    parser.add_argument("--from_snapshot", action="store_true",
+        help="Build the entries from the Parquet snapshots in snapshot_dir, "
+             "saved by a run with --snapshot parquet, without connecting "
+             "to the database")
+
+    # Checkpoint arguments
+    parser.add_argument("--checkpoint", action="store_true",
+        help="Write every schema to its own files and record the progress "
+             "next to the output folder after every schema, so a failed run "
+             "can be resumed")
+    parser.add_argument("--resume", type=str, required=False,
+        help="Output folder of a failed run with --checkpoint, e.g. "
+             "oracle/2025123-235959. Schemas already written to it are skipped")
+
+    # Type mapping arguments
+    parser.add_argument("--type_mapping", type=str, required=False,
+        default="default", choices=["default", "pandas"],
+        help="default: built-in mapping of native types to metadata types. "
+             "pandas: vectorized mapping with regular expression rules")
+    parser.add_argument("--type_rules", type=str, required=False,
+        help="JSON file with [regex, metadata type] rules for the pandas "
+             "type mapping, which replace the built-in rules")
+
     # Google Cloud Storage arguments
     # It is assumed that the bucket is in the same region as the entry group
     parser.add_argument("--output_bucket", type=str, required=True,
@@ -41,8 +155,42 @@ def read_args():
     parser.add_argument("--output_folder", type=str, required=True,
         help="The folder within the Cloud Storage bucket, to write the generated metadata import files. Name only required")
 
+    # Output arguments
+    parser.add_argument("--write_mode", type=str, required=False,
+        default="driver", choices=["driver", "stream", "distributed"],
+        help="driver: collect entries on the driver into one file and upload it. "
+             "stream: like driver, but entries are streamed to the file one "
+             "partition at a time, so driver memory stays flat. "
+             "distributed: executors write entries as many JSONL files "
+             "directly to the output bucket")
+    parser.add_argument("--compress", action="store_true",
+        help="Gzip the output files in the driver and stream write modes")
+    parser.add_argument("--stream_to_gcs", action="store_true",
+        help="Stream output files directly to the bucket, without local files")
+    parser.add_argument("--upload_chunk_size", type=int, required=False, default=16,
+        help="Chunk size in MiB of streamed uploads, buffered in memory for "
+             "the open output file. Default 16")
+    parser.add_argument("--upload_workers", type=int, required=False, default=8,
+        help="Number of output files uploaded concurrently")
+    parser.add_argument("--max_shard_entries", type=int, required=False, default=0,
+        help="Start a new output file after this number of entries. "
+             "Default 0 means no limit")
+    parser.add_argument("--max_shard_bytes", type=int, required=False,
+        default=100 * 1024 * 1024,
+        help="Start a new output file after this number of bytes. "
+             "Default 100 MiB, 0 means no limit")
+
     # Development arguments
     parser.add_argument("--testing", type=str, required=False,
     help="Test mode")
     
-    return vars(parser.parse_known_args()[0])
+    args = parser.parse_known_args()[0]
+    # Every source of the sources file is checked when the file is read
+    if not args.sources_file:
+        if not (args.host and args.port and (args.service or args.sid)):
+            parser.error("--host, --port and one of --service or --sid "
+                         "are required")
+        # Connection credentials are not used to replay a snapshot
+        if not args.from_snapshot and not (args.user and args.password_secret):
+            parser.error("--user and --password-secret are required")
+    return vars(args)
@@ -7,6 +7,16 @@ SOURCE_TYPE = "oracle"
 FORBIDDEN = "#"
 ALLOWED = "!"
 
+# Rules of the pandas type mapping: ordered pairs of a regular expression for
+# the whole Oracle native type and the metadata type. The first match wins.
+METADATA_TYPE_RULES = [
+    (r"NUMBER.*|INTEGER|SHORTINTEGER|LONGINTEGER|BINARY_FLOAT|BINARY_DOUBLE|FLOAT|LONG", "NUMBER"),
+    (r"VARCHAR.*|NVARCHAR2|CHAR|NCHAR|CLOB|NCLOB", "STRING"),
+    (r"BLOB|RAW|LONG RAW", "BYTES"),
+    (r"TIMESTAMP.*", "TIMESTAMP"),
+    (r"DATE", "DATETIME"),
+]
+
 
 class EntryType(enum.Enum):
     """Types of Oracle entries."""
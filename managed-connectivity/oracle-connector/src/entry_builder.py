@@ -1,25 +1,66 @@
 """Creates entries with PySpark."""
+from functools import reduce
+
 import pyspark.sql.functions as F
-from pyspark.sql.types import StringType
 
-from src.constants import EntryType, SOURCE_TYPE
+from src.constants import EntryType, SOURCE_TYPE, METADATA_TYPE_RULES
 from src import name_builder as nb
+from src.row_builder import SCHEMA_KEY
+
+# Shared between connectors, see managed-connectivity/src/shared
+from type_mapping import create_metadata_type_pandas_udf, load_type_rules
 
 
-@F.udf(returnType=StringType())
-def choose_metadata_type_udf(data_type: str):
+def choose_metadata_type(data_type):
     """Choose the metadata type based on Oracle native type."""
-    if data_type.startswith("NUMBER") or data_type in ["INTEGER","SHORTINTEGER","LONGINTEGER","BINARY_FLOAT","BINARY_DOUBLE","FLOAT", "LONG"]:
-        return "NUMBER"
-    if data_type.startswith("VARCHAR") or data_type in ["NVARCHAR2","CHAR","NCHAR","CLOB","NCLOB"]:
-        return "STRING"
-    if data_type in ["LONG","BLOB","RAW","LONG RAW"]:
-        return "BYTES"
-    if data_type.startswith("TIMESTAMP"):
-        return "TIMESTAMP"
-    if data_type == "DATE":
-        return "DATETIME"
-    return "OTHER"
+    # Native expression, so the mapping runs inside the JVM
+    # without shipping every column row to the Python workers
+    return F.when(data_type.startswith("NUMBER")
+                  | data_type.isin(["INTEGER","SHORTINTEGER","LONGINTEGER","BINARY_FLOAT","BINARY_DOUBLE","FLOAT", "LONG"]),
+                  "NUMBER") \
+      .when(data_type.startswith("VARCHAR")
+            | data_type.isin(["NVARCHAR2","CHAR","NCHAR","CLOB","NCLOB"]),
+            "STRING") \
+      .when(data_type.isin(["LONG","BLOB","RAW","LONG RAW"]), "BYTES") \
+      .when(data_type.startswith("TIMESTAMP"), "TIMESTAMP") \
+      .when(data_type == "DATE", "DATETIME") \
+      .otherwise("OTHER")
+
+
+def choose_metadata_type_column(config, data_type):
+    """Creates metadataType column with the configured type mapping."""
+    if config.get("type_mapping") == "pandas":
+        return create_metadata_type_pandas_udf(
+            load_type_rules(config, METADATA_TYPE_RULES))(data_type)
+    return choose_metadata_type(data_type)
+
+
+def create_name(names, schema, table=None, segment=None):
+    """Creates a Dataplex v2 hierarchy name, the same as name_builder does.
+    Args:
+        names - NameResolver of the run
+        schema - column with the schema name
+        table - column with the table name, if the name is for a table or view
+        segment - column with the separator of schema and table
+    """
+    # The constant part of the name is built once by the resolver,
+    # and only the schema and table names are concatenated per row
+    parts = [F.lit(names.schema_name_prefix),
+             F.regexp_replace(schema, nb.FORBIDDEN_SYMBOL, nb.ALLOWED_SYMBOL)]
+    if table is not None:
+        parts += [segment, table]
+    return F.concat(*parts)
+
+
+def create_fqn(names, schema, table=None, segment=None):
+    """Creates a fully qualified name, the same as name_builder does."""
+    escaped_schema = F.when(schema.contains(nb.FORBIDDEN_SYMBOL),
+                            F.concat(F.lit("`"), schema, F.lit("`"))) \
+      .otherwise(schema)
+    parts = [F.lit(names.schema_fqn_prefix), escaped_schema]
+    if table is not None:
+        parts += [segment, table]
+    return F.concat(*parts)
 
 
 def create_entry_source(column):
@@ -65,15 +106,10 @@ def build_schemas(config, df_raw_schemas):
     """
     entry_type = EntryType.DB_SCHEMA
     entry_aspect_name = nb.create_entry_aspect_name(config, entry_type)
+    names = nb.NameResolver(config)
 
     # For schema, parent name is the name of the database
-    parent_name =  nb.create_parent_name(config, entry_type)
-
-    # Create user-defined function.
-    create_name_udf = F.udf(lambda x: nb.create_name(config, entry_type, x),
-                            StringType())
-    create_fqn_udf = F.udf(lambda x: nb.create_fqn(config, entry_type, x),
-                           StringType())
+    parent_name = names.database_name
 
     # Fills the missed project and location into the entry type string
     full_entry_type = entry_type.value.format(
@@ -82,8 +118,8 @@ def build_schemas(config, df_raw_schemas):
 
     # Converts a list of schema names to the Dataplex-compatible form
     column = F.col("USERNAME")
-    df = df_raw_schemas.withColumn("name", create_name_udf(column)) \
-      .withColumn("fully_qualified_name", create_fqn_udf(column)) \
+    df = df_raw_schemas.withColumn("name", create_name(names, column)) \
+      .withColumn("fully_qualified_name", create_fqn(names, column)) \
       .withColumn("parent_entry", F.lit(parent_name)) \
       .withColumn("entry_type", F.lit(full_entry_type)) \
       .withColumn("entry_source", create_entry_source(column)) \
@@ -94,18 +130,8 @@ def build_schemas(config, df_raw_schemas):
     return df
 
 
-def build_dataset(config, df_raw, db_schema, entry_type):
-    """Build table entries from a flat list of columns.
-    Args:
-        df_raw - a plain dataframe with TABLE_NAME, COLUMN_NAME, DATA_TYPE,
-                 and NULLABLE columns
-        db_schema - parent database schema
-        entry_type - entry type: table or view
-    Returns:
-        A dataframe with Dataplex-readable data of tables of views.
-    """
-    schema_key = "dataplex-types.global.schema"
-
+def _aggregate_fields(config, df_raw, group_columns):
+    """Aggregates a flat list of columns into the fields of the tables."""
     # The transformation below does the following
     # 1. Alters NULLABLE content from Y/N to NULLABLE/REQUIRED
     # 2. Renames NULLABLE to mode
@@ -116,26 +142,30 @@ def build_dataset(config, df_raw, db_schema, entry_type):
       .withColumn("mode", F.when(F.col("NULLABLE") == 'Y', "NULLABLE").otherwise("REQUIRED")) \
       .drop("NULLABLE") \
       .withColumnRenamed("DATA_TYPE", "dataType") \
-      .withColumn("metadataType", choose_metadata_type_udf("dataType")) \
+      .withColumn("metadataType", choose_metadata_type_column(config, F.col("dataType"))) \
       .withColumnRenamed("COLUMN_NAME", "name")
 
     # The transformation below aggregate fields, denormalizing the table
     # TABLE_NAME becomes top-level filed, and the rest is put into
     # the array type called "fields"
+    # Repeated column rows, e.g. of a fan-out in the dictionary join, are
+    # dropped within every table, without another shuffle of the rows
     aspect_columns = ["name", "mode", "dataType", "metadataType"]
-    df = df.withColumn("columns", F.struct(aspect_columns))\
-      .groupby('TABLE_NAME') \
-      .agg(F.collect_list("columns").alias("fields"))
+    return df.withColumn("columns", F.struct(aspect_columns))\
+      .groupby(*group_columns) \
+      .agg(F.array_distinct(F.collect_list("columns")).alias("fields"))
+
 
+def _create_aspects(df, entry_aspect_name):
+    """Replaces fields with a map called 'aspects'."""
     # Create nested structured called aspects.
     # Fields are becoming a part of a `schema` struct
     # There is also an entry_aspect that is repeats entry_type as aspect_type
-    entry_aspect_name = nb.create_entry_aspect_name(config, entry_type)
     df = df.withColumn("schema",
-                       F.create_map(F.lit(schema_key),
+                       F.create_map(F.lit(SCHEMA_KEY),
                                     F.named_struct(
                                         F.lit("aspect_type"),
-                                        F.lit(schema_key),
+                                        F.lit(SCHEMA_KEY),
                                         F.lit("data"),
                                         F.create_map(F.lit("fields"),
                                                      F.col("fields")))
@@ -145,17 +175,29 @@ def build_dataset(config, df_raw, db_schema, entry_type):
     .drop("fields")
 
     # Merge separate aspect columns into the one map called 'aspects'
-    df = df.select(F.col("TABLE_NAME"),
-                   F.map_concat("schema", "entry_aspect").alias("aspects"))
+    return df.withColumn("aspects", F.map_concat("schema", "entry_aspect")) \
+      .drop("schema", "entry_aspect")
 
-    # Define user-defined functions to fill the general information
-    # and hierarchy names
-    create_name_udf = F.udf(lambda x: nb.create_name(config, entry_type,
-                                                     db_schema, x),
-                            StringType())
 
-    create_fqn_udf = F.udf(lambda x: nb.create_fqn(config, entry_type,
-                                                   db_schema, x), StringType())
+def build_dataset(config, df_raw, db_schema, entry_type):
+    """Build table entries from a flat list of columns.
+    Args:
+        df_raw - a plain dataframe with TABLE_NAME, COLUMN_NAME, DATA_TYPE,
+                 and NULLABLE columns
+        db_schema - parent database schema
+        entry_type - entry type: table or view
+    Returns:
+        A dataframe with Dataplex-readable data of tables of views.
+    """
+    df = _aggregate_fields(config, df_raw, ["TABLE_NAME"])
+
+    entry_aspect_name = nb.create_entry_aspect_name(config, entry_type)
+    df = _create_aspects(df, entry_aspect_name)
+
+    # Fill the general information and hierarchy names. Prefixes of the
+    # names are the same for every table of the schema
+    name_prefix, fqn_prefix = nb.NameResolver(config).dataset_prefixes(
+        entry_type, db_schema)
 
     parent_name = nb.create_parent_name(entry_type, db_schema)
     full_entry_type = entry_type.value.format(
@@ -164,12 +206,98 @@ def build_dataset(config, df_raw, db_schema, entry_type):
 
     # Fill the top-level fields
     column = F.col("TABLE_NAME")
-    df = df.withColumn("name", create_name_udf(column)) \
-      .withColumn("fully_qualified_name", create_fqn_udf(column)) \
+    df = df.withColumn("name", F.concat(F.lit(name_prefix), column)) \
+      .withColumn("fully_qualified_name", F.concat(F.lit(fqn_prefix), column)) \
       .withColumn("entry_type", F.lit(full_entry_type)) \
       .withColumn("parent_entry", F.lit(parent_name)) \
       .withColumn("entry_source", create_entry_source(column)) \
     .drop(column)
 
-    df = convert_to_import_items(df, [schema_key, entry_aspect_name])
+    df = convert_to_import_items(df, [SCHEMA_KEY, entry_aspect_name])
     return df
+
+
+def _by_object_type(config, value_of):
+    """Chooses the table or the view value based on OBJECT_TYPE column."""
+    return F.when(F.col("OBJECT_TYPE") == EntryType.VIEW.name,
+                  F.lit(value_of(config, EntryType.VIEW))) \
+      .otherwise(F.lit(value_of(config, EntryType.TABLE)))
+
+
+def _format_entry_type(config, entry_type):
+    """Fills the missed project and location into the entry type string."""
+    return entry_type.value.format(
+        project=config["target_project_id"],
+        location=config["target_location_id"])
+
+
+def build_datasets(config, df_raw):
+    """Build table and view entries of all schemas from a flat list of columns.
+    Args:
+        df_raw - a plain dataframe with OWNER, OBJECT_TYPE, TABLE_NAME,
+                 COLUMN_NAME, DATA_TYPE, and NULLABLE columns
+    Returns:
+        A dataframe with Dataplex-readable data of tables and views.
+    """
+    # Tables are grouped within their schema and object type, so the whole
+    # catalog is built in one Spark job regardless of the number of schemas
+    df = _aggregate_fields(config, df_raw, ["OWNER", "OBJECT_TYPE", "TABLE_NAME"])
+
+    entry_aspect_name = _by_object_type(config, nb.create_entry_aspect_name)
+    df = _create_aspects(df, entry_aspect_name)
+
+    # Hierarchy names depend on the schema and the type of every row
+    names = nb.NameResolver(config)
+    schema = F.col("OWNER")
+    name_segment = _by_object_type(config, lambda _, entry_type:
+                                   names.name_segment(entry_type))
+    fqn_segment = _by_object_type(config, lambda _, entry_type:
+                                  names.fqn_segment(entry_type))
+
+    # Fill the top-level fields. Parent entry is left empty the same way
+    # as build_dataset() does for a single schema.
+    column = F.col("TABLE_NAME")
+    df = df.withColumn("name", create_name(names, schema, column, name_segment)) \
+      .withColumn("fully_qualified_name",
+                  create_fqn(names, schema, column, fqn_segment)) \
+      .withColumn("entry_type", _by_object_type(config, _format_entry_type)) \
+      .withColumn("parent_entry", F.lit("")) \
+      .withColumn("entry_source", create_entry_source(column)) \
+    .drop("OWNER", column)
+
+    # The entry aspect key is chosen by OBJECT_TYPE, so it's dropped last
+    df = convert_to_import_items(df, [SCHEMA_KEY, entry_aspect_name])
+    return df.drop("OBJECT_TYPE")
+
+
+def _by_container(config, df_raw, containers, build):
+    """Builds the entries of every pluggable database from its rows, and
+    unions them into one dataframe."""
+    return reduce(lambda df, other: df.unionByName(other),
+                  [build(nb.container_config(config, container),
+                         df_raw.where(F.col("PDB_NAME") == container)
+                         .drop("PDB_NAME"))
+                   for container in containers])
+
+
+def build_cdb_schemas(config, df_raw_schemas, containers):
+    """Create a dataframe with the schemas of all pluggable databases.
+    Args:
+        df_raw_schemas - a dataframe with PDB_NAME and USERNAME columns
+        containers - names of the pluggable databases
+    """
+    return _by_container(config, df_raw_schemas, containers, build_schemas)
+
+
+def build_cdb_datasets(config, df_raw, containers):
+    """Build table and view entries of all pluggable databases.
+    Args:
+        df_raw - a plain dataframe with PDB_NAME, OWNER, OBJECT_TYPE,
+                 TABLE_NAME, COLUMN_NAME, DATA_TYPE, and NULLABLE columns
+        containers - names of the pluggable databases
+    Returns:
+        A dataframe with Dataplex-readable data of tables and views.
+    """
+    # The rows of a container are filtered from the same snapshot, so the
+    # dictionary of the whole CDB is read once
+    return _by_container(config, df_raw, containers, build_datasets)
@@ -1,26 +1,60 @@
-"""Sends files to GCP storage."""
-from typing import Dict
-from google.cloud import storage
+"""Sends files to the output bucket: GCP storage, or a local or in-memory
+sink for debugging and tests, selected by the scheme of output_bucket."""
+from typing import Dict, List, Optional
+
+# Shared between connectors, see managed-connectivity/src/shared
+import output_sink
+
+
+def _sink(config: Dict[str, str]) -> output_sink.OutputSink:
+    """Gets the sink of the output bucket."""
+    return output_sink.create_sink(
+        config["output_bucket"],
+        chunk_size=config["upload_chunk_size"] * 1024 * 1024,
+        max_workers=config["upload_workers"])
+
+
+def output_uri(config: Dict[str, str], folder: str):
+    """Builds the URI of the output folder, e.g. for the Spark writers."""
+    return _sink(config).uri(folder)
 
 
 def upload(config: Dict[str, str], filename: str, folder: str):
-    """Uploads a file to GCP bucket."""
-    client = storage.Client()
-    bucket = client.get_bucket(config["output_bucket"])
-   # folder = config["output_folder"]
+    """Uploads a file to the output bucket."""
+    _sink(config).upload_files([filename], folder)
+
+
+def upload_many(config: Dict[str, str], filenames: List[str], folder: str):
+    """Uploads files to the output bucket concurrently and verifies them."""
+    print(f"Uploading {len(filenames)} files to {folder}...")
+    _sink(config).upload_files(filenames, folder)
+
+
+def opener(config: Dict[str, str], folder: str):
+    """Gets a function opening files of the output folder for streaming."""
+    return _sink(config).opener(folder)
+
+
+def verify_shards(config: Dict[str, str], shards: List[Dict], folder: str):
+    """Checks files streamed to the output bucket against their checksums."""
+    _sink(config).verify(folder, shards)
+
+
+def read_text(config: Dict[str, str], path: str) -> Optional[str]:
+    """Reads a small text file from the output bucket, None if it doesn't exist."""
+    return _sink(config).read_text(path)
+
 
-    blob = bucket.blob(f"{folder}/{filename}")
-    blob.upload_from_filename(filename)
+def write_text(config: Dict[str, str], path: str, text: str):
+    """Writes a small text file to the output bucket."""
+    _sink(config).write_text(path, text)
 
 def checkDestination(config: Dict[str, str]):
     """Check GCS output folder exists"""
-    client = storage.Client()
-    bucketpath = config["output_bucket"]
-    checkpath = bucketpath 
-    bucket = client.bucket(checkpath)
+    sink = _sink(config)
 
-    if not bucket.exists():
-        print(f"Output cloud storage bucket {checkpath} does not exist")
+    if not sink.exists():
+        print(f"Output bucket {config['output_bucket']} does not exist")
         return False
     
-    return True
\ No newline at end of file
+    return True
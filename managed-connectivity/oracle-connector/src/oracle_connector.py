@@ -1,21 +1,41 @@
 """Reads Oracle using PySpark."""
-from typing import Dict
+import os
+import threading
+import time
+from typing import Callable, Dict, List
+from pyspark import StorageLevel
 from pyspark.sql import SparkSession, DataFrame
 
 from src.constants import EntryType
+from src.oracle_queries import DEFAULT_FETCH_SIZE, PRIMARY, STANDBY
+from src import oracle_queries as queries
 
 
 SPARK_JAR_PATH = "/opt/spark/jars/ojdbc11.jar"
 SPARK_JAR_PATH="./ojdbc11.jar"
 
+
+def snapshot_path(config: Dict[str, str], name: str) -> str:
+    """Gets the Parquet path of a snapshot, local if no scheme is given."""
+    snapshot_dir = config.get("snapshot_dir") or "snapshot"
+    if "://" not in snapshot_dir:
+        snapshot_dir = "file://" + os.path.abspath(snapshot_dir)
+    return f"{snapshot_dir}/{name}"
+
+
 class OracleConnector:
     """Reads data from Oracle and returns Spark Dataframes."""
 
     def __init__(self, config: Dict[str, str]):
-        # PySpark entrypoint
-        self._spark = SparkSession.builder.appName("OracleIngestor") \
+        # PySpark entrypoint. _SUCCESS markers are disabled, as the output
+        # folder of the distributed writer must contain only import files
+        builder = SparkSession.builder.appName("OracleIngestor") \
             .config("spark.jars", SPARK_JAR_PATH) \
-            .getOrCreate()
+            .config("spark.hadoop.mapreduce.fileoutputcommitter.marksuccessfuljobs", "false")
+        if config.get("fair_scheduler"):
+            # Concurrent jobs share the executors instead of FIFO order
+            builder = builder.config("spark.scheduler.mode", "FAIR")
+        self._spark = builder.getOrCreate()
 
         self._config = config
         # Use correct JDBC connection string depending on Service vs SID
@@ -24,50 +44,260 @@ class OracleConnector:
         else:
             self._url = f"jdbc:oracle:thin:@{config['host']}:{config['port']}/{config['service']}"
 
-    def _execute(self, query: str) -> DataFrame:
-        """A generic method to execute any query."""
+        # Number of queries sent to the database, reported in the summary.
+        # Without snapshots, every action on a result runs its query again,
+        # so the count of the queries created is a lower bound
+        self.queries_count = 0
+        self.queries_exact = (config.get("snapshot") or "cache") != "none"
+        self._queries_lock = threading.Lock()
+        # Results persisted in the cache, unpersisted by close()
+        self._cached = []
+        # Number of reads per node which served them, reported in the summary
+        self.served_by = {}
+        # Number of standby reads repeated on the primary by fail_over()
+        self.repeated_reads = 0
+
+        # Dictionary queries are routed to a healthy standby, if it's given,
+        # so they don't compete with the workload of the primary
+        self._node = PRIMARY
+        if config.get("standby_service"):
+            host = config.get("standby_host") or config["host"]
+            port = config.get("standby_port") or config["port"]
+            self._standby_url = f"jdbc:oracle:thin:@{host}:{port}/{config['standby_service']}"
+            if self._check_standby():
+                self._node = STANDBY
+
+        # Dictionary views of the column queries, see queries.COLUMN_VIEWS
+        self.views = queries.choose_views(
+            config.get("dictionary_views") or "all", self.can_read)
+
+    def set_scheduler_pool(self, pool: str):
+        """Sets FAIR scheduler pool of the jobs submitted by current thread."""
+        self._spark.sparkContext.setLocalProperty("spark.scheduler.pool", pool)
+
+    def tuning_options(self) -> Dict[str, str]:
+        """JDBC read-tuning options passed to every query."""
+        options = {"fetchsize": str(self._config.get("fetch_size") or DEFAULT_FETCH_SIZE)}
+        if self._config.get("query_timeout"):
+            options["queryTimeout"] = str(self._config["query_timeout"])
+        if self._config.get("session_init_statement"):
+            options["sessionInitStatement"] = self._config["session_init_statement"]
+        if self._config.get("lob_prefetch_size"):
+            # Unknown options are passed by Spark to the driver as properties
+            options["oracle.jdbc.defaultLobPrefetchSize"] = str(self._config["lob_prefetch_size"])
+        return options
+
+    def _options(self) -> Dict[str, str]:
+        """JDBC options shared by every query."""
+        return {
+            "driver": "oracle.jdbc.OracleDriver",
+            "user": self._config["user"],
+            "password": self._config["password"],
+            **self.tuning_options(),
+        }
+
+    def _predicates(self, partition_column: str) -> List[str]:
+        """Splits a query into the partitions which are read in parallel."""
+        if self._config.get("read_predicates"):
+            # User-defined predicates, one per line, e.g. owner ranges
+            with open(self._config["read_predicates"], encoding="utf-8") as file:
+                return [line.strip() for line in file if line.strip()]
+        num_partitions = self._config.get("read_partitions") or 1
+        if num_partitions < 2:
+            return []
+        return [f"ORA_HASH({partition_column}, {num_partitions - 1}) = {bucket}"
+                for bucket in range(num_partitions)]
+
+    def _snapshot(self, df: DataFrame, name: str, reused: bool) -> DataFrame:
+        """Materializes a query result once for all its transforms.
+
+        Spark DataFrames are lazy, so every action on a plain JDBC DataFrame
+        queries the database again. A snapshot is read by the query once.
+        Parquet snapshots are written for every result, so a run can be
+        replayed. The cache only keeps results read by more than one action,
+        the others are streamed once and not held in the executors.
+        """
+        mode = self._config.get("snapshot") or "cache"
+        if mode == "parquet":
+            path = snapshot_path(self._config, name)
+            df.write.mode("overwrite").parquet(path)
+            return self._spark.read.parquet(path)
+        if mode == "cache" and reused:
+            # Spilled to the disk rather than evicted and read again
+            df = df.persist(StorageLevel.MEMORY_AND_DISK)
+            with self._queries_lock:
+                self._cached.append(df)
+        return df
+
+    def _execute(self, query: str, partition_column: str = "",
+                 name: str = "", reused: bool = False) -> DataFrame:
+        """A generic method to execute any query.
+        Args:
+            name - name of the snapshot of the result
+            reused - the result is read by more than one action
+        """
+        predicates = self._predicates(partition_column) if partition_column else []
+        if predicates:
+            # Every predicate becomes a separate task, so large dictionaries
+            # are streamed by all the executors instead of a single one
+            df = self._on_node(lambda url: self._spark.read.jdbc(
+                url, f"({query})", predicates=predicates,
+                properties=self._options()))
+        else:
+            df = self._read(query)
+
+        with self._queries_lock:
+            self.queries_count += len(predicates) or 1
+        return self._snapshot(df, name, reused)
+
+    def _jdbc(self, url: str, query: str) -> DataFrame:
+        """Reads the result of a query from a node in a single partition."""
         return self._spark.read.format("jdbc") \
-            .option("driver", "oracle.jdbc.OracleDriver") \
-            .option("url", self._url) \
+            .options(**self._options()) \
+            .option("url", url) \
             .option("query", query) \
-            .option("user", self._config["user"]) \
-            .option("password", self._config["password"]) \
             .load()
 
+    def _read(self, query: str) -> DataFrame:
+        """Reads the result of a query in a single partition."""
+        return self._on_node(lambda url: self._jdbc(url, query))
+
+    def _on_node(self, read: Callable[[str], DataFrame]) -> DataFrame:
+        """Reads from the node chosen for the run, or from the primary if
+        the standby fails.
+
+        Spark connects when a read is created, to resolve the schema of
+        the result, so a standby which is down fails here. The rows are
+        read later by the actions, so a standby which fails then fails the
+        extraction, which is repeated after fail_over().
+        """
+        node = self._node
+        if node == STANDBY:
+            try:
+                df = read(self._standby_url)
+            except Exception as ex:
+                print(f"Standby failed, reading from the primary: "
+                      f"{str(ex).splitlines()[0]}")
+                node = PRIMARY
+        if node == PRIMARY:
+            df = read(self._url)
+        with self._queries_lock:
+            self.served_by[node] = self.served_by.get(node, 0) + 1
+        return df
+
+    def fail_over(self) -> bool:
+        """Sends all the next reads to the primary, after the standby
+        failed while the rows of a read were fetched.
+        Returns:
+            True if the reads were sent to the standby.
+        """
+        with self._queries_lock:
+            if self._node != STANDBY:
+                return False
+            self._node = PRIMARY
+            # Results of the standby are read again, not served by it
+            self.repeated_reads += self.served_by.pop(STANDBY, 0)
+        return True
+
+    def _check_standby(self) -> bool:
+        """Checks if the standby is up and takes the reads off the primary."""
+        with self._queries_lock:
+            self.queries_count += 1
+        try:
+            row = self._jdbc(self._standby_url, queries.database_role()).collect()[0]
+        except Exception as ex:
+            print(f"Standby can't be read, using the primary: "
+                  f"{str(ex).splitlines()[0]}")
+            return False
+        if not queries.serves_reads(row.DATABASE_ROLE, row.OPEN_MODE):
+            print(f"Standby is {row.DATABASE_ROLE} {row.OPEN_MODE}, "
+                  f"using the primary")
+            return False
+        print(f"Reading from the standby, {row.DATABASE_ROLE} {row.OPEN_MODE}")
+        return True
+
+    def can_read(self, view: str) -> bool:
+        """Checks if the user can select from a dictionary view.
+
+        A probe which fails on the standby is repeated on the primary, so
+        a failure of the standby isn't taken for a view which is not granted.
+        """
+        nodes = [STANDBY, PRIMARY] if self._node == STANDBY else [PRIMARY]
+        for node in nodes:
+            with self._queries_lock:
+                self.queries_count += 1
+            url = self._standby_url if node == STANDBY else self._url
+            try:
+                # Rows are read by collect(), so it's within the fallback too
+                self._jdbc(url, queries.probe(view)).collect()
+            except Exception as ex:
+                # ORA-00942 when the view is not granted, wrapped by Py4J
+                print(f"{view} can't be read from the {node}: "
+                      f"{str(ex).splitlines()[0]}")
+                continue
+            with self._queries_lock:
+                self.served_by[node] = self.served_by.get(node, 0) + 1
+            return True
+        return False
+
+    def time_query(self, query: str) -> float:
+        """Reads all rows of a query without keeping them, returns seconds."""
+        with self._queries_lock:
+            self.queries_count += 1
+        start = time.monotonic()
+        # The noop sink reads every column of every row inside the JVM
+        self._read(query).write.format("noop").mode("overwrite").save()
+        return time.monotonic() - start
+
     def get_db_schemas(self) -> DataFrame:
         """In Oracle, schemas are usernames."""
-        """Query selects all schemas, excluding system schemas"""
-        query = """
-        SELECT username FROM dba_users WHERE username not in 
-        ('SYS','SYSTEM','XS$NULL',
-        'OJVMSYS','LBACSYS','OUTLN',
-        'DBSNMP','APPQOSSYS','DBSFWUSER',
-        'GGSYS','ANONYMOUS','CTXSYS',
-        'DVSYS','DVF','AUDSYS','GSMADMIN_INTERNAL',
-        'OLAPSYS','MDSYS','WMSYS','GSMCATUSER',
-        'MDDATA','SYSBACKUP','REMOTE_SCHEDULER_AGENT',
-        'GSMUSER','SYSRAC','GSMROOTUSER','SI_INFORMTN_SCHEM',
-        'DIP','ORDPLUGINS','SYSKM','SI_INFORMTN_SCHEMA',
-        'DGPDB_INT','ORDDATA','ORACLE_OCM',
-        'SYS$UMF','SYSD','ORDSYS','SYSDG','PDADMIN')
-        """
-        return self._execute(query)
-
-    def _get_columns(self, schema_name: str, object_type: str) -> str:
-        """Gets a list of columns in tables or views in a batch."""
-        # Every line here is a column that belongs to the table or to the view.
-        # This SQL gets data from ALL the tables in a given schema.
-        return (f"SELECT col.TABLE_NAME, col.COLUMN_NAME, "
-                f"col.DATA_TYPE, col.NULLABLE "
-                f"FROM all_tab_columns col "
-                f"INNER JOIN DBA_OBJECTS tab "
-                f"ON tab.OBJECT_NAME = col.TABLE_NAME "
-                f"WHERE tab.OWNER = '{schema_name}' "
-                f"AND tab.OBJECT_TYPE = '{object_type}'")
-
-    def get_dataset(self, schema_name: str, entry_type: EntryType):
+        # Read for the list of schemas and for their entries
+        return self._execute(queries.db_schemas(), name="schemas", reused=True)
+
+    def get_ddl_watermarks(self) -> DataFrame:
+        """Gets the time of the latest DDL of tables and views per schema."""
+        return self._execute(queries.ddl_watermarks(), name="watermarks")
+
+    def get_dataset(self, schema_name: str, entry_type: EntryType,
+                    since: str = ""):
         """Gets data for a table or a view."""
         # Dataset means that these entities can contain end user data.
         short_type = entry_type.name  # table or view, or the title of enum value
-        query = self._get_columns(schema_name, short_type)
-        return self._execute(query)
+        query = queries.columns(schema_name, short_type, since, self.views)
+        # All rows share the same owner, so split them by the table name
+        return self._execute(query, partition_column="TABLE_NAME",
+                             name=f"columns/{schema_name}/{short_type}")
+
+    def get_all_datasets(self, watermarks: Dict[str, str] = None) -> DataFrame:
+        """Gets data for the tables and views of all schemas in one query.
+        Args:
+            watermarks - if given, only objects with DDL changed after
+                         the watermark of their schema are returned
+        """
+        query = queries.all_columns(watermarks, views=self.views)
+        return self._execute(query, partition_column="OWNER", name="all_columns")
+
+    def get_containers(self) -> DataFrame:
+        """Gets PDB_NAME of the pluggable databases of a CDB."""
+        return self._execute(queries.cdb_containers(), name="containers")
+
+    def get_cdb_schemas(self) -> DataFrame:
+        """Gets PDB_NAME and USERNAME of the schemas of all pluggable
+        databases of a CDB."""
+        # Read for the list of schemas and for the entries of every container
+        return self._execute(queries.cdb_schemas(), name="cdb_schemas",
+                             reused=True)
+
+    def get_cdb_datasets(self) -> DataFrame:
+        """Gets data for the tables and views of all pluggable databases
+        of a CDB in one query."""
+        # Read for the entries of every container
+        return self._execute(queries.cdb_columns(), partition_column="OWNER",
+                             name="cdb_columns", reused=True)
+
+    def close(self):
+        """Unpersists the cached results, once their entries are written."""
+        with self._queries_lock:
+            cached, self._cached = self._cached, []
+        for df in cached:
+            df.unpersist()
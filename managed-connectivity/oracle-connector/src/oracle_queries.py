@@ -0,0 +1,193 @@
+"""SQL queries of the Oracle data dictionary, shared by the engines."""
+from typing import Callable, Dict
+
+# Oracle-maintained schemas which are excluded from the metadata extract
+SYSTEM_SCHEMAS = (
+    'SYS','SYSTEM','XS$NULL',
+    'OJVMSYS','LBACSYS','OUTLN',
+    'DBSNMP','APPQOSSYS','DBSFWUSER',
+    'GGSYS','ANONYMOUS','CTXSYS',
+    'DVSYS','DVF','AUDSYS','GSMADMIN_INTERNAL',
+    'OLAPSYS','MDSYS','WMSYS','GSMCATUSER',
+    'MDDATA','SYSBACKUP','REMOTE_SCHEDULER_AGENT',
+    'GSMUSER','SYSRAC','GSMROOTUSER','SI_INFORMTN_SCHEM',
+    'DIP','ORDPLUGINS','SYSKM','SI_INFORMTN_SCHEMA',
+    'DGPDB_INT','ORDDATA','ORACLE_OCM',
+    'SYS$UMF','SYSD','ORDSYS','SYSDG','PDADMIN')
+
+# The thin drivers fetch 10 to 100 rows per round-trip by default, which is
+# too chatty for large dictionary queries over high latency links
+DEFAULT_FETCH_SIZE = 10000
+
+# Nodes which serve the queries, reported in the summary
+PRIMARY = "primary"
+STANDBY = "standby"
+
+# LAST_DDL_TIME is compared as text in this format between runs
+DDL_TIME_FORMAT = "YYYY-MM-DD HH24:MI:SS"
+# Bound of the objects of the schemas without a watermark, older than any DDL
+NO_WATERMARK = "1900-01-01 00:00:00"
+
+# Dictionary views of the columns, by strategy. ALL_ views check the
+# privileges of the user on every object. DBA_ views skip the checks and are
+# usually much faster, but require SELECT_CATALOG_ROLE or a similar grant
+COLUMN_VIEWS = {"all": "all_tab_columns", "dba": "dba_tab_columns"}
+# Strategies tried by auto, the fastest first
+PREFERRED_VIEWS = ("dba", "all")
+
+# A multitenant container database (CDB) is read from its root container.
+# CDB_ views return the rows of every open pluggable database (PDB), with
+# its CON_ID. The seed is the template of new PDBs, so it's not extracted
+SEED_CONTAINER = "PDB$SEED"
+
+_SYSTEM_SCHEMAS_LIST = ",".join(f"'{schema}'" for schema in SYSTEM_SCHEMAS)
+
+
+def probe(view: str) -> str:
+    """Query which fails unless the user can select from the view."""
+    return f"SELECT 1 FROM {view} WHERE ROWNUM = 1"
+
+
+def choose_views(strategy: str, can_read: Callable[[str], bool]) -> str:
+    """Resolves the auto strategy to the fastest views the user can read."""
+    if strategy != "auto":
+        return strategy
+    # ALL_ views can be read by any user, so they are not probed
+    return next(views for views in PREFERRED_VIEWS
+                if views == "all" or can_read(COLUMN_VIEWS[views]))
+
+
+def database_role() -> str:
+    """Gets the Data Guard role and the open mode of the database."""
+    return "SELECT DATABASE_ROLE, OPEN_MODE FROM V$DATABASE"
+
+
+def serves_reads(role: str, open_mode: str) -> bool:
+    """Checks if a database takes the dictionary reads off the primary:
+    a standby, or a database opened read only."""
+    return role != "PRIMARY" or open_mode.startswith("READ ONLY")
+
+
+def db_schemas() -> str:
+    """Query selects all schemas, excluding system schemas"""
+    # In Oracle, schemas are usernames
+    return (f"SELECT username FROM dba_users "
+            f"WHERE username NOT IN ({_SYSTEM_SCHEMAS_LIST})")
+
+
+def ddl_watermarks() -> str:
+    """Gets the time of the latest DDL of tables and views per schema."""
+    # LAST_DDL_TIME has a resolution of one second, and objects are read
+    # with a DDL time after the watermark. DDL later in the second the
+    # watermark is taken would be missed, so the current second is never
+    # a watermark, and its objects are read again by the next run
+    return (f"SELECT OWNER, "
+            f"TO_CHAR(LEAST(MAX(LAST_DDL_TIME), SYSDATE - 1 / 86400), "
+            f"'{DDL_TIME_FORMAT}') AS LAST_DDL_TIME "
+            f"FROM DBA_OBJECTS "
+            f"WHERE OBJECT_TYPE IN ('TABLE', 'VIEW') "
+            f"AND OWNER NOT IN ({_SYSTEM_SCHEMAS_LIST}) "
+            f"GROUP BY OWNER")
+
+
+def columns(schema_name: str, object_type: str, since: str = "",
+            views: str = "all", ordered: bool = False) -> str:
+    """Gets a list of columns in tables or views in a batch.
+    Args:
+        ordered - if set, the columns of every object are consecutive
+    """
+    # Every line here is a column that belongs to the table or to the view.
+    # This SQL gets data from ALL the tables in a given schema.
+    # Objects are joined on the owner too, otherwise the columns of a table
+    # repeat for every schema with an object of the same name
+    query = (f"SELECT col.TABLE_NAME, col.COLUMN_NAME, "
+             f"col.DATA_TYPE, col.NULLABLE "
+             f"FROM {COLUMN_VIEWS[views]} col "
+             f"INNER JOIN DBA_OBJECTS tab "
+             f"ON tab.OWNER = col.OWNER "
+             f"AND tab.OBJECT_NAME = col.TABLE_NAME "
+             f"WHERE col.OWNER = '{schema_name}' "
+             f"AND tab.OBJECT_TYPE = '{object_type}'")
+    if since:
+        # Only objects with DDL changed after the previous run
+        query += f" AND tab.LAST_DDL_TIME > {_ddl_time(since)}"
+    if ordered:
+        query += " ORDER BY col.TABLE_NAME"
+    return query
+
+
+def _ddl_time(value: str) -> str:
+    """Converts a watermark to an Oracle date."""
+    return f"TO_DATE('{value}', '{DDL_TIME_FORMAT}')"
+
+
+def all_columns(watermarks: Dict[str, str] = None, views: str = "all",
+                ordered: bool = False) -> str:
+    """Gets a list of columns in all tables and views of all schemas.
+    Args:
+        watermarks - if given, only objects with DDL changed after the
+                     watermark of their schema are returned, and all
+                     objects of the schemas without a watermark
+        ordered - if set, the columns of every object are consecutive
+    """
+    # Every line here is a column that belongs to the table or to the view.
+    # OWNER and OBJECT_TYPE are carried through, so the entries of every
+    # schema can be built from the result of this single query.
+    query = (f"SELECT col.OWNER, tab.OBJECT_TYPE, col.TABLE_NAME, "
+             f"col.COLUMN_NAME, col.DATA_TYPE, col.NULLABLE "
+             f"FROM {COLUMN_VIEWS[views]} col "
+             f"INNER JOIN DBA_OBJECTS tab "
+             f"ON tab.OWNER = col.OWNER "
+             f"AND tab.OBJECT_NAME = col.TABLE_NAME "
+             f"WHERE tab.OBJECT_TYPE IN ('TABLE', 'VIEW') "
+             f"AND tab.OWNER NOT IN ({_SYSTEM_SCHEMAS_LIST})")
+    if watermarks:
+        # The bound of every owner is chosen in the database, so no object
+        # of a schema is dropped by the watermark of another one. Unlike
+        # an IN list, a CASE isn't limited to 1000 owners
+        bounds = " ".join(f"WHEN '{owner}' THEN {_ddl_time(watermark)}"
+                          for owner, watermark in sorted(watermarks.items()))
+        query += (f" AND tab.LAST_DDL_TIME > CASE tab.OWNER {bounds} "
+                  f"ELSE {_ddl_time(NO_WATERMARK)} END")
+    if ordered:
+        # A table and a view of an owner can't have the same name
+        query += " ORDER BY col.OWNER, col.TABLE_NAME"
+    return query
+
+
+def cdb_containers() -> str:
+    """Gets the pluggable databases of a CDB, except the seed."""
+    return f"SELECT PDB_NAME FROM CDB_PDBS WHERE PDB_NAME <> '{SEED_CONTAINER}'"
+
+
+def cdb_schemas() -> str:
+    """Query selects the schemas of all pluggable databases, excluding
+    system schemas."""
+    return (f"SELECT pdb.PDB_NAME, usr.USERNAME FROM CDB_USERS usr "
+            f"INNER JOIN CDB_PDBS pdb ON pdb.CON_ID = usr.CON_ID "
+            f"WHERE pdb.PDB_NAME <> '{SEED_CONTAINER}' "
+            f"AND usr.USERNAME NOT IN ({_SYSTEM_SCHEMAS_LIST})")
+
+
+def cdb_columns(ordered: bool = False) -> str:
+    """Gets a list of columns in all tables and views of all schemas of
+    all pluggable databases.
+    Args:
+        ordered - if set, the columns of every object are consecutive
+    """
+    # The same as all_columns(), with PDB_NAME carried through. Objects are
+    # joined within their container, as names repeat across the containers
+    query = (f"SELECT pdb.PDB_NAME, col.OWNER, tab.OBJECT_TYPE, col.TABLE_NAME, "
+             f"col.COLUMN_NAME, col.DATA_TYPE, col.NULLABLE "
+             f"FROM CDB_TAB_COLUMNS col "
+             f"INNER JOIN CDB_OBJECTS tab "
+             f"ON tab.CON_ID = col.CON_ID "
+             f"AND tab.OWNER = col.OWNER "
+             f"AND tab.OBJECT_NAME = col.TABLE_NAME "
+             f"INNER JOIN CDB_PDBS pdb ON pdb.CON_ID = col.CON_ID "
+             f"WHERE pdb.PDB_NAME <> '{SEED_CONTAINER}' "
+             f"AND tab.OBJECT_TYPE IN ('TABLE', 'VIEW') "
+             f"AND tab.OWNER NOT IN ({_SYSTEM_SCHEMAS_LIST})")
+    if ordered:
+        query += " ORDER BY pdb.PDB_NAME, col.OWNER, col.TABLE_NAME"
+    return query
@@ -0,0 +1,225 @@
+"""Reads Oracle using python-oracledb, without Spark."""
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from src.constants import EntryType
+from src.oracle_queries import DEFAULT_FETCH_SIZE, PRIMARY, STANDBY
+from src import oracle_queries as queries
+
+
+class OracledbConnector:
+    """Reads data from Oracle in python-oracledb thin mode.
+
+    Thin mode is pure Python and needs neither a JVM nor Oracle Client
+    libraries, so small catalogs are extracted in seconds.
+    """
+
+    def __init__(self, config: Dict[str, str]):
+        self._config = config
+        # Number of queries sent to the database, reported in the summary
+        self.queries_count = 0
+        # Every query is fetched by one cursor
+        self.queries_exact = True
+        # Number of queries per node which served them, reported in the summary
+        self.served_by = {}
+        # Number of standby queries repeated on the primary by fail_over()
+        self.repeated_reads = 0
+        self._connections = {}
+
+        # Dictionary queries are routed to a healthy standby, if it's given,
+        # so they don't compete with the workload of the primary. Then the
+        # primary is connected only if the standby fails
+        self._node = PRIMARY
+        if config.get("standby_service") and self._check_standby():
+            self._node = STANDBY
+        else:
+            self._connect(PRIMARY)
+
+        # Dictionary views of the column queries, see queries.COLUMN_VIEWS
+        self.views = queries.choose_views(
+            config.get("dictionary_views") or "all", self.can_read)
+
+    def _fetch_size(self) -> int:
+        return self._config.get("fetch_size") or DEFAULT_FETCH_SIZE
+
+    def tuning_options(self) -> Dict[str, str]:
+        """Cursor read-tuning options of every query."""
+        options = {"arraysize": str(self._fetch_size()),
+                   "prefetchrows": str(self._fetch_size())}
+        if self._config.get("query_timeout"):
+            options["call_timeout"] = str(self._config["query_timeout"] * 1000)
+        return options
+
+    def _connect(self, node: str):
+        """Gets the connection to a node, connected on the first use."""
+        if node in self._connections:
+            return self._connections[node]
+        # Only required by this engine
+        import oracledb
+
+        config = self._config
+        if node == STANDBY:
+            params = {"service_name": config["standby_service"]}
+            host = config.get("standby_host") or config["host"]
+            port = config.get("standby_port") or config["port"]
+        else:
+            # Use SID or Service name, the same as the JDBC connection string
+            if config["sid"]:
+                params = {"sid": config["sid"]}
+            else:
+                params = {"service_name": config["service"]}
+            host, port = config["host"], config["port"]
+        connection = oracledb.connect(
+            user=config["user"], password=config["password"],
+            host=host, port=int(port), **params)
+
+        if config.get("query_timeout"):
+            # Milliseconds for every round-trip, seconds in the JDBC option
+            connection.call_timeout = config["query_timeout"] * 1000
+        if config.get("session_init_statement"):
+            with connection.cursor() as cursor:
+                cursor.execute(config["session_init_statement"])
+        self._connections[node] = connection
+        return connection
+
+    def _open_cursor(self, node: str, query: str):
+        """Executes a query on a node, returns the cursor with its rows."""
+        cursor = self._connect(node).cursor()
+        # The first batch comes with the execute round-trip
+        cursor.prefetchrows = self._fetch_size()
+        cursor.arraysize = self._fetch_size()
+        try:
+            cursor.execute(query)
+        except Exception:
+            cursor.close()
+            raise
+        return cursor
+
+    def _check_standby(self) -> bool:
+        """Checks if the standby is up and takes the reads off the primary."""
+        self.queries_count += 1
+        try:
+            with self._open_cursor(STANDBY, queries.database_role()) as cursor:
+                role, open_mode = cursor.fetchone()
+        except Exception as ex:
+            print(f"Standby can't be read, using the primary: "
+                  f"{str(ex).splitlines()[0]}")
+            return False
+        if not queries.serves_reads(role, open_mode):
+            print(f"Standby is {role} {open_mode}, using the primary")
+            return False
+        print(f"Reading from the standby, {role} {open_mode}")
+        return True
+
+    def fail_over(self) -> bool:
+        """Sends all the next queries to the primary, after the standby
+        failed while the rows of a query were fetched.
+        Returns:
+            True if the queries were sent to the standby.
+        """
+        if self._node != STANDBY:
+            return False
+        self._node = PRIMARY
+        # Results of the standby are read again, not served by it
+        self.repeated_reads += self.served_by.pop(STANDBY, 0)
+        return True
+
+    def _execute(self, query: str) -> Iterator[Tuple]:
+        """Executes a query and streams its rows in batches.
+
+        A query which fails on the standby is executed on the primary.
+        Rows are not read again, so a failure while they are fetched is
+        raised, and the extraction is repeated after fail_over().
+        """
+        self.queries_count += 1
+        node = self._node
+        if node == STANDBY:
+            try:
+                cursor = self._open_cursor(STANDBY, query)
+            except Exception as ex:
+                print(f"Standby failed, reading from the primary: "
+                      f"{str(ex).splitlines()[0]}")
+                node = PRIMARY
+        if node == PRIMARY:
+            cursor = self._open_cursor(PRIMARY, query)
+        self.served_by[node] = self.served_by.get(node, 0) + 1
+        with cursor:
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                yield from rows
+
+    def can_read(self, view: str) -> bool:
+        """Checks if the user can select from a dictionary view.
+
+        A probe which fails on the standby is repeated on the primary, so
+        a failure of the standby isn't taken for a view which is not granted.
+        """
+        nodes = [STANDBY, PRIMARY] if self._node == STANDBY else [PRIMARY]
+        for node in nodes:
+            self.queries_count += 1
+            try:
+                with self._open_cursor(node, queries.probe(view)) as cursor:
+                    cursor.fetchall()
+            except Exception as ex:
+                # ORA-00942 when the view is not granted
+                print(f"{view} can't be read from the {node}: "
+                      f"{str(ex).splitlines()[0]}")
+                continue
+            self.served_by[node] = self.served_by.get(node, 0) + 1
+            return True
+        return False
+
+    def time_query(self, query: str) -> float:
+        """Fetches all rows of a query without keeping them, returns seconds."""
+        start = time.monotonic()
+        for _ in self._execute(query):
+            pass
+        return time.monotonic() - start
+
+    def get_db_schemas(self) -> List[str]:
+        """In Oracle, schemas are usernames."""
+        return [row[0] for row in self._execute(queries.db_schemas())]
+
+    def get_ddl_watermarks(self) -> Dict[str, str]:
+        """Gets the time of the latest DDL of tables and views per schema."""
+        return dict(self._execute(queries.ddl_watermarks()))
+
+    def get_dataset(self, schema_name: str, entry_type: EntryType,
+                    since: str = "") -> Iterator[Tuple]:
+        """Gets TABLE_NAME, COLUMN_NAME, DATA_TYPE, NULLABLE rows of the
+        columns of tables or views in a schema, ordered by table."""
+        return self._execute(queries.columns(schema_name, entry_type.name, since,
+                                             self.views, ordered=True))
+
+    def get_all_datasets(self, watermarks: Dict[str, str] = None) -> Iterator[Tuple]:
+        """Gets OWNER, OBJECT_TYPE, TABLE_NAME, COLUMN_NAME, DATA_TYPE,
+        NULLABLE rows of the columns of all schemas in one query, ordered
+        by owner and table.
+        Args:
+            watermarks - if given, only objects with DDL changed after
+                         the watermark of their schema are returned
+        """
+        return self._execute(queries.all_columns(watermarks, views=self.views,
+                                                 ordered=True))
+
+    def get_containers(self) -> List[str]:
+        """Gets the names of the pluggable databases of a CDB."""
+        return [row[0] for row in self._execute(queries.cdb_containers())]
+
+    def get_cdb_schemas(self) -> Iterator[Tuple]:
+        """Gets PDB_NAME, USERNAME rows of the schemas of all pluggable
+        databases of a CDB."""
+        return self._execute(queries.cdb_schemas())
+
+    def get_cdb_datasets(self) -> Iterator[Tuple]:
+        """Gets PDB_NAME, OWNER, OBJECT_TYPE, TABLE_NAME, COLUMN_NAME,
+        DATA_TYPE, NULLABLE rows of the columns of all pluggable databases
+        of a CDB in one query, ordered by container, owner and table."""
+        return self._execute(queries.cdb_columns(ordered=True))
+
+    def close(self):
+        """Closes the connections."""
+        for connection in self._connections.values():
+            connection.close()
@@ -0,0 +1,158 @@
+"""Creates entries from the rows of python-oracledb, without Spark.
+
+Import items have the same shape and key order as the JSON of the
+DataFrames built by entry_builder, so both engines produce the same output.
+"""
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from src.constants import EntryType, SOURCE_TYPE, METADATA_TYPE_RULES
+from src import name_builder as nb
+
+# Shared between connectors, see managed-connectivity/src/shared
+from serialization import dumps, entry_aspect, import_item
+from type_mapping import create_metadata_type_mapping, load_type_rules
+
+
+SCHEMA_KEY = "dataplex-types.global.schema"
+
+
+def _format_entry_type(config, entry_type: EntryType) -> str:
+    """Fills the missed project and location into the entry type string."""
+    return entry_type.value.format(
+        project=config["target_project_id"],
+        location=config["target_location_id"])
+
+
+def build_schemas(config, schemas: Iterable[str]) -> Iterator[str]:
+    """Create Dataplex-readable schemas from the list of usernames."""
+    entry_type = EntryType.DB_SCHEMA
+    entry_aspect_name = nb.create_entry_aspect_name(config, entry_type)
+    names = nb.NameResolver(config)
+    full_entry_type = _format_entry_type(config, entry_type)
+
+    for schema in schemas:
+        entry = {
+            "name": names.schema_name(schema),
+            "fully_qualified_name": names.schema_fqn(schema),
+            "parent_entry": names.database_name,
+            "entry_source": {"display_name": schema, "system": SOURCE_TYPE},
+            "aspects": entry_aspect(entry_aspect_name),
+            "entry_type": full_entry_type,
+        }
+        yield dumps(import_item(entry, [entry_aspect_name], ["aspects"]))
+
+
+def _create_table(config, names: nb.NameResolver, schema: str, table: str,
+                  entry_type: EntryType, fields: List[Dict]) -> Dict:
+    """Creates the import item of a table or a view."""
+    entry_aspect_name = nb.create_entry_aspect_name(config, entry_type)
+    aspects = {SCHEMA_KEY: {"aspect_type": SCHEMA_KEY,
+                            "data": {"fields": fields}}}
+    aspects.update(entry_aspect(entry_aspect_name))
+    entry = {
+        "name": names.dataset_name(entry_type, schema, table),
+        "fully_qualified_name": names.dataset_fqn(entry_type, schema, table),
+        # Parent entry is left empty the same way as entry_builder does
+        "parent_entry": "",
+        "entry_source": {"display_name": table, "system": SOURCE_TYPE},
+        "aspects": aspects,
+        "entry_type": _format_entry_type(config, entry_type),
+    }
+    return import_item(entry, [SCHEMA_KEY, entry_aspect_name], ["aspects"])
+
+
+def _aggregate_fields(config, rows: Iterable[Tuple],
+                      key_length: int) -> Iterator[Tuple[Tuple, List[Dict]]]:
+    """Aggregates a flat list of columns into the fields of the tables.
+
+    Rows start with key_length columns identifying the table, followed by
+    COLUMN_NAME, DATA_TYPE and NULLABLE. The rows of a table must be
+    consecutive, so every table is yielded when its last row is read and
+    only the fields of one table are kept at a time.
+    """
+    # The built-in rules map types the same way as the default Spark mapping
+    choose_metadata_type = create_metadata_type_mapping(
+        load_type_rules(config, METADATA_TYPE_RULES))
+    for table, table_rows in groupby(rows, key=lambda row: row[:key_length]):
+        fields = {}
+        for row in table_rows:
+            column_name, data_type, nullable = row[key_length:key_length + 3]
+            if column_name in fields:
+                # Repeated column row, e.g. of a fan-out in the dictionary join
+                continue
+            fields[column_name] = {
+                "name": column_name,
+                "mode": "NULLABLE" if nullable == "Y" else "REQUIRED",
+                "dataType": data_type,
+                "metadataType": choose_metadata_type(data_type),
+            }
+        yield table, list(fields.values())
+
+
+def build_dataset(config, rows: Iterable[Tuple], db_schema: str,
+                  entry_type: EntryType) -> Iterator[str]:
+    """Build table entries from a flat list of columns.
+    Args:
+        rows - TABLE_NAME, COLUMN_NAME, DATA_TYPE, and NULLABLE tuples,
+               ordered by table
+        db_schema - parent database schema
+        entry_type - entry type: table or view
+    Returns:
+        JSON strings with Dataplex-readable data of tables of views.
+    """
+    names = nb.NameResolver(config)
+    for (table,), fields in _aggregate_fields(config, rows, key_length=1):
+        yield dumps(_create_table(config, names, db_schema, table,
+                                  entry_type, fields))
+
+
+def build_datasets(config, rows: Iterable[Tuple]) -> Iterator[str]:
+    """Build table and view entries of all schemas from a flat list of columns.
+    Args:
+        rows - OWNER, OBJECT_TYPE, TABLE_NAME, COLUMN_NAME, DATA_TYPE, and
+               NULLABLE tuples, ordered by owner and table
+    Returns:
+        JSON strings with Dataplex-readable data of tables and views.
+    """
+    names = nb.NameResolver(config)
+    for (schema, object_type, table), fields in _aggregate_fields(
+            config, rows, key_length=3):
+        entry_type = EntryType.VIEW if object_type == EntryType.VIEW.name \
+            else EntryType.TABLE
+        yield dumps(_create_table(config, names, schema, table,
+                                  entry_type, fields))
+
+
+def build_cdb_schemas(config, rows: Iterable[Tuple]) -> Iterator[str]:
+    """Create Dataplex-readable schemas of all pluggable databases of a CDB.
+    Args:
+        rows - PDB_NAME and USERNAME tuples
+    """
+    usernames = {}
+    for container, schema in rows:
+        usernames.setdefault(container, []).append(schema)
+    for container, schemas in usernames.items():
+        yield from build_schemas(nb.container_config(config, container), schemas)
+
+
+def build_cdb_datasets(config, rows: Iterable[Tuple]) -> Iterator[str]:
+    """Build table and view entries of all pluggable databases of a CDB.
+    Args:
+        rows - PDB_NAME, OWNER, OBJECT_TYPE, TABLE_NAME, COLUMN_NAME,
+               DATA_TYPE, and NULLABLE tuples, ordered by container, owner
+               and table
+    Returns:
+        JSON strings with Dataplex-readable data of tables and views.
+    """
+    resolvers = {}
+    for (container, schema, object_type, table), fields in _aggregate_fields(
+            config, rows, key_length=4):
+        names = resolvers.get(container)
+        if names is None:
+            names = nb.NameResolver(nb.container_config(config, container))
+            resolvers[container] = names
+        entry_type = EntryType.VIEW if object_type == EntryType.VIEW.name \
+            else EntryType.TABLE
+        yield dumps(_create_table(config, names, schema, table,
+                                  entry_type, fields))
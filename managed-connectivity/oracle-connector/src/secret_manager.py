@@ -1,12 +1,19 @@
 """A module to get a password from the Secret Manager."""
+from functools import lru_cache
+
 from google.cloud import secretmanager
 
 
+@lru_cache(maxsize=None)
+def _client() -> secretmanager.SecretManagerServiceClient:
+    """Creates the client once, it's shared by the sources of a run."""
+    return secretmanager.SecretManagerServiceClient()
+
+
 def get_password(secret_path: str) -> str:
     """Gets password from a GCP service."""
-    client = secretmanager.SecretManagerServiceClient()
     if "versions" not in secret_path:
         # If not specified, we need the latest version of a password
         secret_path = f"{secret_path}/versions/latest"
-    response = client.access_secret_version(request={"name": secret_path})
+    response = _client().access_secret_version(request={"name": secret_path})
     return response.payload.data.decode("UTF-8")
@@ -0,0 +1,59 @@
+"""Reads the Oracle catalog from a Parquet snapshot using PySpark."""
+from typing import Dict
+from pyspark.sql import SparkSession, DataFrame
+
+from src.constants import EntryType
+from src.oracle_connector import snapshot_path
+
+
+class SnapshotConnector:
+    """Reads data saved by a run with --snapshot parquet and returns Spark
+    Dataframes, the same as OracleConnector reads them from the database.
+
+    Entries can be rebuilt from production-size catalogs without
+    the database and its password, e.g. to test the entry builders.
+    """
+
+    def __init__(self, config: Dict[str, str]):
+        # PySpark entrypoint
+        self._spark = SparkSession.builder.appName("OracleSnapshotReplay") \
+            .getOrCreate()
+        self._config = config
+        # No query is sent to the database
+        self.queries_count = 0
+        self.queries_exact = True
+        self.served_by = {}
+        self.repeated_reads = 0
+
+    def set_scheduler_pool(self, pool: str):
+        """Sets FAIR scheduler pool of the jobs submitted by current thread."""
+        self._spark.sparkContext.setLocalProperty("spark.scheduler.pool", pool)
+
+    def tuning_options(self) -> Dict[str, str]:
+        """Snapshots are read without any JDBC options."""
+        return {}
+
+    def fail_over(self) -> bool:
+        """There is no standby to fail over from."""
+        return False
+
+    def _read(self, name: str) -> DataFrame:
+        """Reads one snapshot saved by OracleConnector."""
+        return self._spark.read.parquet(snapshot_path(self._config, name))
+
+    def get_db_schemas(self) -> DataFrame:
+        """In Oracle, schemas are usernames."""
+        return self._read("schemas")
+
+    def get_dataset(self, schema_name: str, entry_type: EntryType,
+                    since: str = ""):
+        """Gets data for a table or a view."""
+        return self._read(f"columns/{schema_name}/{entry_type.name}")
+
+    def get_all_datasets(self, watermarks: Dict[str, str] = None) -> DataFrame:
+        """Gets data for the tables and views of all schemas."""
+        # Snapshots of former incremental runs have the DDL time as well
+        return self._read("all_columns").drop("LAST_DDL_TIME")
+
+    def close(self):
+        """Nothing is cached, snapshots are read from their files."""
@@ -0,0 +1,81 @@
+"""Fixtures shared by the tests of the connector."""
+import json
+import os
+import sys
+
+import pytest
+
+# The same paths as main.py adds, so src and the shared modules are found
+CONNECTOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SHARED_DIR = os.path.join(CONNECTOR_DIR, "..", "src", "shared")
+sys.path.insert(0, CONNECTOR_DIR)
+sys.path.insert(1, SHARED_DIR)
+# Python workers of Spark get PYTHONPATH, not sys.path of the driver
+os.environ["PYTHONPATH"] = os.pathsep.join(
+    filter(None, [CONNECTOR_DIR, SHARED_DIR, os.environ.get("PYTHONPATH")]))
+
+SAMPLE_PATH = os.path.join(CONNECTOR_DIR, "sample", "oracle_output_sample.jsonl")
+
+# Config of the run which produced the sample output
+SAMPLE_CONFIG = {
+    "target_project_id": "daniel-dataplex",
+    "target_location_id": "us-central1",
+    "target_entry_group_id": "oracle",
+    "host": "oracle-server.us-central1-a.c.daniel-dataplex.internal:1521",
+    "port": "1521",
+    "service": "XEPDB1",
+    "sid": None,
+    "type_mapping": "default",
+    "type_rules": None,
+}
+
+SCHEMA_KEY = "dataplex-types.global.schema"
+
+
+def read_sample():
+    """Reads import items of the sample, some lines hold more than one."""
+    decoder = json.JSONDecoder()
+    text = open(SAMPLE_PATH, encoding="utf-8").read()
+    items, position = [], 0
+    while True:
+        while position < len(text) and text[position].isspace():
+            position += 1
+        if position == len(text):
+            return items
+        item, position = decoder.raw_decode(text, position)
+        items.append(item)
+
+
+def sample_rows():
+    """Gets the usernames and the column rows behind the sample entries."""
+    usernames, columns = [], []
+    for item in read_sample():
+        entry = item["entry"]
+        entry_type = entry["entry_type"].rsplit("-", 1)[-1]
+        if entry_type == "schema":
+            usernames.append(entry["entry_source"]["display_name"])
+        elif entry_type in ("table", "view"):
+            schema = entry["fully_qualified_name"].split(".")[-2]
+            for field in entry["aspects"][SCHEMA_KEY]["data"]["fields"]:
+                columns.append((schema, entry_type.upper(),
+                                entry["entry_source"]["display_name"],
+                                field["name"], field["dataType"],
+                                "Y" if field["mode"] == "NULLABLE" else "N"))
+    return usernames, columns
+
+
+@pytest.fixture(scope="session")
+def spark():
+    """Local SparkSession, skips the test if PySpark or Java is missing."""
+    pytest.importorskip("pyspark")
+    from pyspark.sql import SparkSession
+    try:
+        session = SparkSession.builder.master("local[1]") \
+            .appName("OracleConnectorTests") \
+            .config("spark.sql.shuffle.partitions", "1") \
+            .config("spark.ui.enabled", "false") \
+            .getOrCreate()
+    except Exception as ex:
+        pytest.skip(f"Spark can't be started: {ex}")
+    yield session
+    session.stop()
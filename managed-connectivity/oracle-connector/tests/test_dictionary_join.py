@@ -0,0 +1,111 @@
+"""Columns of objects with the same name in many schemas are read once.
+
+The column queries run against a synthetic dictionary in SQLite, where
+every schema has the same table and view names.
+"""
+import json
+import sqlite3
+
+import pytest
+
+from conftest import SAMPLE_CONFIG
+from src.constants import EntryType
+from src import oracle_queries
+from src import row_builder
+
+SCHEMA_KEY = "dataplex-types.global.schema"
+SCHEMAS = [f"OWNER{number}" for number in range(20)]
+OBJECTS = {"TABLE": ["ORDERS", "CUSTOMERS", "ITEMS"], "VIEW": ["ORDER_TOTALS"]}
+COLUMN_COUNT = 10
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    """In-memory dictionary with the same objects in every schema."""
+    connection = sqlite3.connect(":memory:")
+    for view in oracle_queries.COLUMN_VIEWS.values():
+        connection.execute(f"CREATE TABLE {view} (OWNER, TABLE_NAME, "
+                           f"COLUMN_NAME, DATA_TYPE, NULLABLE)")
+    connection.execute("CREATE TABLE DBA_OBJECTS (OWNER, OBJECT_NAME, "
+                       "OBJECT_TYPE, LAST_DDL_TIME)")
+    for schema in SCHEMAS:
+        for object_type, names in OBJECTS.items():
+            for name in names:
+                connection.execute("INSERT INTO DBA_OBJECTS VALUES (?, ?, ?, ?)",
+                                   (schema, name, object_type, "2025-01-01"))
+                for view in oracle_queries.COLUMN_VIEWS.values():
+                    connection.executemany(
+                        f"INSERT INTO {view} VALUES (?, ?, ?, ?, ?)",
+                        [(schema, name, f"COL{number}", "NUMBER", "Y")
+                         for number in range(COLUMN_COUNT)])
+    yield connection
+    connection.close()
+
+
+@pytest.mark.parametrize("views", sorted(oracle_queries.COLUMN_VIEWS))
+@pytest.mark.parametrize("object_type", sorted(OBJECTS))
+def test_schema_columns_are_read_once(catalog, views, object_type):
+    query = oracle_queries.columns("OWNER7", object_type, views=views)
+    rows = catalog.execute(query).fetchall()
+    expected = [(name, f"COL{number}")
+                for name in OBJECTS[object_type] for number in range(COLUMN_COUNT)]
+    assert sorted(row[:2] for row in rows) == sorted(expected)
+
+
+@pytest.mark.parametrize("views", sorted(oracle_queries.COLUMN_VIEWS))
+def test_all_columns_are_read_once(catalog, views):
+    rows = catalog.execute(oracle_queries.all_columns(views=views)).fetchall()
+    keys = [row[:4] for row in rows]
+    assert len(keys) == len(set(keys))
+    assert len(keys) == len(SCHEMAS) * COLUMN_COUNT * \
+        sum(len(names) for names in OBJECTS.values())
+
+
+def fanned_out_rows(copies=3):
+    """Column rows of the bulk query, each repeated like in a bad join."""
+    return [(schema, object_type, name, f"COL{number}", "NUMBER", "Y")
+            for schema in SCHEMAS[:3]
+            for object_type, names in OBJECTS.items()
+            for name in names
+            for number in range(COLUMN_COUNT)
+            for _ in range(copies)]
+
+
+def field_names(line):
+    """Gets the names of the fields of an entry."""
+    entry = json.loads(line)["entry"]
+    return [field["name"]
+            for field in entry["aspects"][SCHEMA_KEY]["data"]["fields"]]
+
+
+def assert_no_repeated_fields(lines):
+    """Checks that every entry has each of its columns once."""
+    assert lines
+    for line in lines:
+        names = field_names(line)
+        assert sorted(names) == sorted(f"COL{number}"
+                                       for number in range(COLUMN_COUNT))
+
+
+def test_row_builder_drops_repeated_fields():
+    assert_no_repeated_fields(list(
+        row_builder.build_datasets(SAMPLE_CONFIG, fanned_out_rows())))
+    rows = [row[2:] for row in fanned_out_rows()
+            if row[:2] == (SCHEMAS[0], "TABLE")]
+    assert_no_repeated_fields(list(row_builder.build_dataset(
+        SAMPLE_CONFIG, rows, SCHEMAS[0], EntryType.TABLE)))
+
+
+def test_entry_builder_drops_repeated_fields(spark):
+    from src import entry_builder
+    df_raw = spark.createDataFrame(
+        fanned_out_rows(),
+        "OWNER string, OBJECT_TYPE string, TABLE_NAME string, "
+        "COLUMN_NAME string, DATA_TYPE string, NULLABLE string")
+    assert_no_repeated_fields(
+        entry_builder.build_datasets(SAMPLE_CONFIG, df_raw).toJSON().collect())
+    df_schema = df_raw.where((df_raw.OWNER == SCHEMAS[0])
+                             & (df_raw.OBJECT_TYPE == "TABLE")) \
+        .drop("OWNER", "OBJECT_TYPE")
+    assert_no_repeated_fields(entry_builder.build_dataset(
+        SAMPLE_CONFIG, df_schema, SCHEMAS[0], EntryType.TABLE).toJSON().collect())
@@ -0,0 +1,164 @@
+"""Entries built with native column expressions are the same as entries
+built with the Python UDFs they replaced.
+
+The rows are read back from sample/oracle_output_sample.jsonl, and both
+implementations build the entries from them.
+"""
+import pytest
+
+pytest.importorskip("pyspark")
+
+import pyspark.sql.functions as F
+from pyspark.sql.types import StringType
+
+from conftest import SAMPLE_CONFIG, SCHEMA_KEY, sample_rows
+from type_mapping import create_metadata_type_pandas_udf
+from src.constants import EntryType, METADATA_TYPE_RULES
+from src import entry_builder
+from src import name_builder as nb
+
+# The implementation with Python UDFs, as it was before the native
+# column expressions replaced it
+
+@F.udf(returnType=StringType())
+def legacy_choose_metadata_type_udf(data_type: str):
+    if data_type.startswith("NUMBER") or data_type in ["INTEGER","SHORTINTEGER","LONGINTEGER","BINARY_FLOAT","BINARY_DOUBLE","FLOAT", "LONG"]:
+        return "NUMBER"
+    if data_type.startswith("VARCHAR") or data_type in ["NVARCHAR2","CHAR","NCHAR","CLOB","NCLOB"]:
+        return "STRING"
+    if data_type in ["LONG","BLOB","RAW","LONG RAW"]:
+        return "BYTES"
+    if data_type.startswith("TIMESTAMP"):
+        return "TIMESTAMP"
+    if data_type == "DATE":
+        return "DATETIME"
+    return "OTHER"
+
+
+def legacy_build_schemas(config, df_raw_schemas):
+    entry_type = EntryType.DB_SCHEMA
+    entry_aspect_name = nb.create_entry_aspect_name(config, entry_type)
+    parent_name = nb.create_parent_name(config, entry_type)
+    create_name_udf = F.udf(lambda x: nb.create_name(config, entry_type, x),
+                            StringType())
+    create_fqn_udf = F.udf(lambda x: nb.create_fqn(config, entry_type, x),
+                           StringType())
+    full_entry_type = entry_type.value.format(
+        project=config["target_project_id"],
+        location=config["target_location_id"])
+    column = F.col("USERNAME")
+    df = df_raw_schemas.withColumn("name", create_name_udf(column)) \
+      .withColumn("fully_qualified_name", create_fqn_udf(column)) \
+      .withColumn("parent_entry", F.lit(parent_name)) \
+      .withColumn("entry_type", F.lit(full_entry_type)) \
+      .withColumn("entry_source", entry_builder.create_entry_source(column)) \
+      .withColumn("aspects", entry_builder.create_entry_aspect(entry_aspect_name)) \
+    .drop(column)
+    return entry_builder.convert_to_import_items(df, [entry_aspect_name])
+
+
+def legacy_build_dataset(config, df_raw, db_schema, entry_type):
+    df = df_raw \
+      .withColumn("mode", F.when(F.col("NULLABLE") == 'Y', "NULLABLE").otherwise("REQUIRED")) \
+      .drop("NULLABLE") \
+      .withColumnRenamed("DATA_TYPE", "dataType") \
+      .withColumn("metadataType", legacy_choose_metadata_type_udf("dataType")) \
+      .withColumnRenamed("COLUMN_NAME", "name")
+    aspect_columns = ["name", "mode", "dataType", "metadataType"]
+    df = df.withColumn("columns", F.struct(aspect_columns))\
+      .groupby('TABLE_NAME') \
+      .agg(F.collect_list("columns").alias("fields"))
+    entry_aspect_name = nb.create_entry_aspect_name(config, entry_type)
+    df = df.withColumn("schema",
+                       F.create_map(F.lit(SCHEMA_KEY),
+                                    F.named_struct(
+                                        F.lit("aspect_type"),
+                                        F.lit(SCHEMA_KEY),
+                                        F.lit("data"),
+                                        F.create_map(F.lit("fields"),
+                                                     F.col("fields")))
+                                    )
+                       )\
+      .withColumn("entry_aspect", entry_builder.create_entry_aspect(entry_aspect_name)) \
+    .drop("fields")
+    df = df.select(F.col("TABLE_NAME"),
+                   F.map_concat("schema", "entry_aspect").alias("aspects"))
+    create_name_udf = F.udf(lambda x: nb.create_name(config, entry_type,
+                                                     db_schema, x),
+                            StringType())
+    create_fqn_udf = F.udf(lambda x: nb.create_fqn(config, entry_type,
+                                                   db_schema, x), StringType())
+    parent_name = nb.create_parent_name(entry_type, db_schema)
+    full_entry_type = entry_type.value.format(
+        project=config["target_project_id"],
+        location=config["target_location_id"])
+    column = F.col("TABLE_NAME")
+    df = df.withColumn("name", create_name_udf(column)) \
+      .withColumn("fully_qualified_name", create_fqn_udf(column)) \
+      .withColumn("entry_type", F.lit(full_entry_type)) \
+      .withColumn("parent_entry", F.lit(parent_name)) \
+      .withColumn("entry_source", entry_builder.create_entry_source(column)) \
+    .drop(column)
+    return entry_builder.convert_to_import_items(df, [SCHEMA_KEY, entry_aspect_name])
+
+
+def jsonl(df):
+    """Gets the JSONL lines of a dataframe in a stable order."""
+    return sorted(df.toJSON().collect())
+
+
+def test_sample_has_rows():
+    usernames, columns = sample_rows()
+    assert "C##DMS" in usernames
+    assert {row[1] for row in columns} == {"TABLE", "VIEW"}
+
+
+def test_schemas_match_udf_output(spark):
+    usernames, _ = sample_rows()
+    df_raw = spark.createDataFrame([(name,) for name in usernames], "USERNAME string")
+    assert jsonl(entry_builder.build_schemas(SAMPLE_CONFIG, df_raw)) == \
+        jsonl(legacy_build_schemas(SAMPLE_CONFIG, df_raw))
+
+
+def test_datasets_match_udf_output(spark):
+    _, columns = sample_rows()
+    df_all = spark.createDataFrame(
+        columns, "OWNER string, OBJECT_TYPE string, TABLE_NAME string, "
+                 "COLUMN_NAME string, DATA_TYPE string, NULLABLE string")
+    for schema, object_type in sorted({row[:2] for row in columns}):
+        entry_type = EntryType[object_type]
+        df_raw = df_all.where((F.col("OWNER") == schema)
+                              & (F.col("OBJECT_TYPE") == object_type)) \
+            .drop("OWNER", "OBJECT_TYPE")
+        expected = jsonl(legacy_build_dataset(SAMPLE_CONFIG, df_raw, schema, entry_type))
+        assert expected
+        assert jsonl(entry_builder.build_dataset(
+            SAMPLE_CONFIG, df_raw, schema, entry_type)) == expected
+
+
+# Every branch of the mapping, including the types of no branch
+DATA_TYPES = ["NUMBER", "NUMBER(10,2)", "INTEGER", "FLOAT", "LONG",
+              "BINARY_DOUBLE", "VARCHAR2", "NVARCHAR2", "CHAR", "NCLOB",
+              "BLOB", "RAW", "LONG RAW", "TIMESTAMP(6)",
+              "TIMESTAMP(6) WITH TIME ZONE", "DATE", "XMLTYPE", "ROWID"]
+
+
+def test_metadata_types_match_udf(spark):
+    df = spark.createDataFrame([(data_type,) for data_type in DATA_TYPES],
+                               "dataType string")
+    rows = df.select(
+        "dataType",
+        entry_builder.choose_metadata_type(F.col("dataType")).alias("native"),
+        legacy_choose_metadata_type_udf("dataType").alias("udf")).collect()
+    assert [(row.dataType, row.native) for row in rows] == \
+        [(row.dataType, row.udf) for row in rows]
+
+
+def test_pandas_rules_match_native_mapping(spark):
+    df = spark.createDataFrame([(data_type,) for data_type in DATA_TYPES],
+                               "dataType string")
+    pandas_udf = create_metadata_type_pandas_udf(METADATA_TYPE_RULES)
+    rows = df.select(
+        entry_builder.choose_metadata_type(F.col("dataType")).alias("native"),
+        pandas_udf(F.col("dataType")).alias("pandas")).collect()
+    assert [row.native for row in rows] == [row.pandas for row in rows]
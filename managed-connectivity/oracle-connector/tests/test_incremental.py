@@ -0,0 +1,84 @@
+"""Incremental extraction reads the objects changed since the watermark of
+their schema, and all objects of the schemas without a watermark.
+
+The bulk column query runs against a synthetic dictionary in SQLite.
+"""
+import sqlite3
+
+import pytest
+
+from src import oracle_queries
+from src.oracledb_connector import OracledbConnector
+
+# Schema, object, DDL time, all the objects are tables with one column
+OBJECTS = [
+    ("HR", "OLD_TABLE", "2025-01-01 10:00:00"),
+    ("HR", "BOUNDARY_TABLE", "2025-03-01 12:00:00"),
+    ("HR", "NEW_TABLE", "2025-03-01 12:00:01"),
+    ("SALES", "OLD_TABLE", "2024-06-01 08:00:00"),
+    ("SALES", "NEW_TABLE", "2025-05-01 08:00:00"),
+    # Not in the watermarks, e.g. created after the previous run
+    ("NEW_SCHEMA", "OLDEST_TABLE", "2020-01-01 00:00:00"),
+    ("NEW_SCHEMA", "NEW_TABLE", "2025-05-01 08:00:00"),
+]
+WATERMARKS = {"HR": "2025-03-01 12:00:00", "SALES": "2025-04-01 00:00:00"}
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    """In-memory dictionary with DDL times as text in DDL_TIME_FORMAT."""
+    connection = sqlite3.connect(":memory:")
+    # Text in the watermark format compares the same way as Oracle dates
+    connection.create_function("TO_DATE", 2, lambda value, _: value)
+    for view in oracle_queries.COLUMN_VIEWS.values():
+        connection.execute(f"CREATE TABLE {view} (OWNER, TABLE_NAME, "
+                           f"COLUMN_NAME, DATA_TYPE, NULLABLE)")
+        connection.executemany(f"INSERT INTO {view} VALUES (?, ?, 'ID', 'NUMBER', 'N')",
+                               [(owner, name) for owner, name, _ in OBJECTS])
+    connection.execute("CREATE TABLE DBA_OBJECTS (OWNER, OBJECT_NAME, "
+                       "OBJECT_TYPE, LAST_DDL_TIME)")
+    connection.executemany("INSERT INTO DBA_OBJECTS VALUES (?, ?, 'TABLE', ?)",
+                           OBJECTS)
+    yield connection
+    connection.close()
+
+
+def objects(rows):
+    """Gets the schema and the table of the column rows."""
+    return sorted((row[0], row[2]) for row in rows)
+
+
+def test_without_watermarks_reads_all(catalog):
+    rows = catalog.execute(oracle_queries.all_columns()).fetchall()
+    assert objects(rows) == sorted((owner, name) for owner, name, _ in OBJECTS)
+
+
+def test_schema_without_watermark_keeps_old_objects(catalog):
+    rows = catalog.execute(oracle_queries.all_columns(WATERMARKS)).fetchall()
+    assert objects(rows) == [
+        ("HR", "NEW_TABLE"),
+        ("NEW_SCHEMA", "NEW_TABLE"),
+        ("NEW_SCHEMA", "OLDEST_TABLE"),
+        ("SALES", "NEW_TABLE"),
+    ]
+
+
+def test_oracledb_connector_reads_changed_objects(catalog):
+    connector = OracledbConnector.__new__(OracledbConnector)
+    connector.views = "dba"
+    connector._execute = lambda query: iter(catalog.execute(query).fetchall())
+    rows = list(connector.get_all_datasets(WATERMARKS))
+    assert ("NEW_SCHEMA", "TABLE", "OLDEST_TABLE", "ID", "NUMBER", "N") in rows
+    assert ("HR", "OLD_TABLE") not in objects(rows)
+
+
+def test_watermark_excludes_current_second():
+    query = oracle_queries.ddl_watermarks()
+    assert "LEAST(MAX(LAST_DDL_TIME), SYSDATE - 1 / 86400)" in query
+
+
+def test_many_watermarks_are_not_an_in_list():
+    # Oracle allows at most 1000 expressions in an IN list
+    watermarks = {f"OWNER{number}": WATERMARKS["HR"] for number in range(1500)}
+    query = oracle_queries.all_columns(watermarks)
+    assert query.count("WHEN 'OWNER") == 1500
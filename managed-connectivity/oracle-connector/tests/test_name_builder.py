@@ -0,0 +1,60 @@
+"""NameResolver builds the same names as the recursive name builders."""
+import pytest
+
+from conftest import SAMPLE_CONFIG
+from src.constants import EntryType
+from src import name_builder as nb
+
+CONFIGS = {
+    "service": SAMPLE_CONFIG,
+    "sid": {**SAMPLE_CONFIG, "service": None, "sid": "ORCL"},
+    "container": nb.container_config(SAMPLE_CONFIG, "SALESPDB"),
+}
+SCHEMAS = ["HR", "C##DMS", "#", "A#B#C", "WITH$DOLLAR", ""]
+DATASET_TYPES = [EntryType.TABLE, EntryType.VIEW]
+
+
+@pytest.fixture(params=sorted(CONFIGS))
+def config(request):
+    return CONFIGS[request.param]
+
+
+def test_covers_every_entry_type():
+    assert {EntryType.INSTANCE, EntryType.DATABASE, EntryType.DB_SCHEMA,
+            *DATASET_TYPES} == set(EntryType)
+
+
+def test_top_entries(config):
+    names = nb.NameResolver(config)
+    assert names.instance_name == nb.create_name(config, EntryType.INSTANCE)
+    assert names.instance_fqn == nb.create_fqn(config, EntryType.INSTANCE)
+    assert names.database_name == nb.create_name(config, EntryType.DATABASE)
+    assert names.database_fqn == nb.create_fqn(config, EntryType.DATABASE)
+
+
+@pytest.mark.parametrize("schema", SCHEMAS)
+def test_schemas(config, schema):
+    names = nb.NameResolver(config)
+    # The second call is served from the cache of the resolver
+    for _ in range(2):
+        assert names.schema_name(schema) == \
+            nb.create_name(config, EntryType.DB_SCHEMA, schema)
+        assert names.schema_fqn(schema) == \
+            nb.create_fqn(config, EntryType.DB_SCHEMA, schema)
+
+
+@pytest.mark.parametrize("entry_type", DATASET_TYPES)
+@pytest.mark.parametrize("schema", SCHEMAS)
+def test_datasets(config, schema, entry_type):
+    names = nb.NameResolver(config)
+    for table in ["EMPLOYEES", "T#1", ""]:
+        assert names.dataset_name(entry_type, schema, table) == \
+            nb.create_name(config, entry_type, schema, table)
+        assert names.dataset_fqn(entry_type, schema, table) == \
+            nb.create_fqn(config, entry_type, schema, table)
+
+
+def test_escaped_schema():
+    names = nb.NameResolver(SAMPLE_CONFIG)
+    assert names.schema_name("C##DMS").endswith("/C!!DMS")
+    assert names.schema_fqn("C##DMS").endswith(".`C##DMS`")
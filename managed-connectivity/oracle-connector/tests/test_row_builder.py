@@ -0,0 +1,102 @@
+"""Entries built by row_builder from python-oracledb rows are the same as
+entries built by entry_builder from a dataframe of the same rows.
+
+The rows are read back from sample/oracle_output_sample.jsonl, ordered the
+same way as the queries of the oracledb engine order them.
+"""
+from itertools import islice
+
+import pytest
+
+from conftest import SAMPLE_CONFIG, sample_rows
+from src.constants import EntryType
+from src import row_builder
+
+COLUMNS_SCHEMA = ("OWNER string, OBJECT_TYPE string, TABLE_NAME string, "
+                  "COLUMN_NAME string, DATA_TYPE string, NULLABLE string")
+CONTAINERS = ["PDB1", "PDB2"]
+
+
+def ordered_rows():
+    """Gets the column rows of the sample ordered by owner and table, with
+    a repeated column row like a fan-out of the dictionary join leaves."""
+    _, columns = sample_rows()
+    columns = sorted(columns, key=lambda row: (row[0], row[2]))
+    return columns[:1] + columns
+
+
+def jsonl(df):
+    """Gets the JSONL lines of a dataframe in a stable order."""
+    return sorted(df.toJSON().collect())
+
+
+def test_schemas_match_entry_builder(spark):
+    from src import entry_builder
+    usernames, _ = sample_rows()
+    df_raw = spark.createDataFrame([(name,) for name in usernames],
+                                   "USERNAME string")
+    assert sorted(row_builder.build_schemas(SAMPLE_CONFIG, usernames)) == \
+        jsonl(entry_builder.build_schemas(SAMPLE_CONFIG, df_raw))
+
+
+def test_dataset_matches_entry_builder(spark):
+    from src import entry_builder
+    columns = ordered_rows()
+    for schema, object_type in sorted({row[:2] for row in columns}):
+        rows = [row[2:] for row in columns
+                if row[:2] == (schema, object_type)]
+        df_raw = spark.createDataFrame(
+            rows, "TABLE_NAME string, COLUMN_NAME string, "
+                  "DATA_TYPE string, NULLABLE string")
+        entry_type = EntryType[object_type]
+        expected = jsonl(entry_builder.build_dataset(
+            SAMPLE_CONFIG, df_raw, schema, entry_type))
+        assert expected
+        assert sorted(row_builder.build_dataset(
+            SAMPLE_CONFIG, rows, schema, entry_type)) == expected
+
+
+def test_datasets_match_entry_builder(spark):
+    from src import entry_builder
+    columns = ordered_rows()
+    df_raw = spark.createDataFrame(columns, COLUMNS_SCHEMA)
+    expected = jsonl(entry_builder.build_datasets(SAMPLE_CONFIG, df_raw))
+    assert len(expected) == len({(row[0], row[2]) for row in columns})
+    assert sorted(row_builder.build_datasets(SAMPLE_CONFIG, columns)) == expected
+
+
+def test_cdb_datasets_match_entry_builder(spark):
+    from src import entry_builder
+    columns = [(container,) + row for container in CONTAINERS
+               for row in ordered_rows()]
+    df_raw = spark.createDataFrame(columns, "PDB_NAME string, " + COLUMNS_SCHEMA)
+    expected = jsonl(entry_builder.build_cdb_datasets(
+        SAMPLE_CONFIG, df_raw, CONTAINERS))
+    assert sorted(row_builder.build_cdb_datasets(SAMPLE_CONFIG, columns)) == \
+        expected
+
+
+def test_tables_are_yielded_as_they_complete():
+    columns = ordered_rows()
+    read = []
+
+    def rows():
+        for row in columns:
+            read.append(row)
+            yield row
+
+    first_table = [row for row in columns if row[:3] == columns[0][:3]]
+    assert len(list(islice(row_builder.build_datasets(SAMPLE_CONFIG, rows()),
+                           1))) == 1
+    # Only the rows of the first table and the first row of the next one
+    assert read == first_table + [columns[len(first_table)]]
+
+
+@pytest.mark.parametrize("key", [("T",), ("OWNER", "TABLE", "T")])
+def test_repeated_columns_are_dropped(key):
+    rows = [key + ("ID", "NUMBER", "N"), key + ("ID", "NUMBER", "N"),
+            key + ("NAME", "VARCHAR2", "Y")]
+    [(table, fields)] = row_builder._aggregate_fields(SAMPLE_CONFIG, rows,
+                                                      len(key))
+    assert table == key
+    assert [field["name"] for field in fields] == ["ID", "NAME"]
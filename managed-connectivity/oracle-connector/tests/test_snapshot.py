@@ -0,0 +1,53 @@
+"""Snapshots of the query results in the cache mode, and the query count."""
+import threading
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+from src import bootstrap
+from src.oracle_connector import OracleConnector
+
+
+def create_connector(spark, snapshot):
+    """Creates a connector of the snapshot mode without a database."""
+    connector = OracleConnector.__new__(OracleConnector)
+    connector._spark = spark
+    connector._config = {"snapshot": snapshot}
+    connector.queries_count = 0
+    connector.queries_exact = snapshot != "none"
+    connector._queries_lock = threading.Lock()
+    connector._cached = []
+    connector.served_by = {}
+    connector.repeated_reads = 0
+    return connector
+
+
+def test_cache_keeps_only_reused_results(spark):
+    connector = create_connector(spark, "cache")
+    reused = connector._snapshot(spark.range(3), "schemas", reused=True)
+    once = connector._snapshot(spark.range(3), "columns/HR/TABLE", reused=False)
+    assert reused.is_cached
+    assert not once.is_cached
+
+    connector.close()
+    assert not reused.is_cached
+    assert connector._cached == []
+
+
+def test_none_keeps_nothing(spark):
+    connector = create_connector(spark, "none")
+    assert not connector._snapshot(spark.range(3), "schemas", reused=True).is_cached
+    connector.close()
+
+
+@pytest.mark.parametrize("snapshot, expected", [
+    ("cache", "with 7 source queries"),
+    ("none", "with at least 7 source queries"),
+])
+def test_summary_labels_lower_bound(spark, capsys, snapshot, expected):
+    connector = create_connector(spark, snapshot)
+    connector.queries_count = 7
+    connector.tuning_options = lambda: {}
+    bootstrap.print_summary(connector, 10, 0.0, "memory://test")
+    assert expected in capsys.readouterr().out
@@ -0,0 +1,232 @@
+"""Reads are routed to a healthy standby, and fall back to the primary."""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.oracle_queries import PRIMARY, STANDBY
+from src.oracledb_connector import OracledbConnector
+
+NOT_GRANTED = "ORA-00942: table or view does not exist"
+STANDBY_DOWN = "DPY-4011: the database or network closed the connection"
+
+
+class FakeCursor:
+    """Cursor whose rows fail with the error given, if any."""
+
+    def __init__(self, error, rows=((1,),)):
+        self._error = error
+        self._rows = list(rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def fetchall(self):
+        if self._error:
+            raise RuntimeError(self._error)
+        return self._rows
+
+    def fetchone(self):
+        return self.fetchall()[0]
+
+    def fetchmany(self):
+        rows, self._rows = self.fetchall()[:1], self._rows[1:]
+        return rows
+
+
+def oracledb_connector(node, errors, rows=((1,),)):
+    """Creates a connector reading from the node, without a database.
+    Args:
+        errors - error of every node, STANDBY_DOWN fails when a query is
+                 executed, others when its rows are fetched
+    """
+    connector = OracledbConnector.__new__(OracledbConnector)
+    connector.queries_count = 0
+    connector.served_by = {}
+    connector.repeated_reads = 0
+    connector._node = node
+
+    def open_cursor(node, query):
+        if errors.get(node) == STANDBY_DOWN:
+            raise RuntimeError(STANDBY_DOWN)
+        return FakeCursor(errors.get(node), rows)
+
+    connector._open_cursor = open_cursor
+    return connector
+
+
+@pytest.mark.parametrize("node, errors, readable, served_by", [
+    (PRIMARY, {}, True, {PRIMARY: 1}),
+    (PRIMARY, {PRIMARY: NOT_GRANTED}, False, {}),
+    (STANDBY, {}, True, {STANDBY: 1}),
+    (STANDBY, {STANDBY: STANDBY_DOWN}, True, {PRIMARY: 1}),
+    (STANDBY, {STANDBY: NOT_GRANTED}, True, {PRIMARY: 1}),
+    (STANDBY, {STANDBY: NOT_GRANTED, PRIMARY: NOT_GRANTED}, False, {}),
+])
+def test_oracledb_probe(node, errors, readable, served_by):
+    connector = oracledb_connector(node, errors)
+    assert connector.can_read("dba_tab_columns") == readable
+    assert connector.served_by == served_by
+
+
+class FakeRead:
+    """JDBC read, whose rows fail on the nodes given."""
+
+    def __init__(self, error, rows=((1,),)):
+        self._error = error
+        self._rows = list(rows)
+
+    def collect(self):
+        if self._error:
+            raise RuntimeError(self._error)
+        return self._rows
+
+
+def spark_connector(node, errors, rows=((1,),)):
+    """Creates a Spark connector reading from the node, without Spark."""
+    pytest.importorskip("pyspark")
+    from src.oracle_connector import OracleConnector
+    connector = OracleConnector.__new__(OracleConnector)
+    connector.queries_count = 0
+    connector.served_by = {}
+    connector.repeated_reads = 0
+    connector._queries_lock = threading.Lock()
+    connector._config = {"snapshot": "none"}
+    connector._node = node
+    connector._url = "primary-url"
+    connector._standby_url = "standby-url"
+    urls = {"primary-url": PRIMARY, "standby-url": STANDBY}
+
+    def jdbc(url, query):
+        # Spark resolves the columns of the result when a read is created
+        if errors.get(urls[url]) == STANDBY_DOWN:
+            raise RuntimeError(STANDBY_DOWN)
+        return FakeRead(errors.get(urls[url]), rows)
+
+    connector._jdbc = jdbc
+    return connector
+
+
+@pytest.mark.parametrize("errors, readable, served_by", [
+    ({}, True, {STANDBY: 1}),
+    ({STANDBY: STANDBY_DOWN}, True, {PRIMARY: 1}),
+    ({STANDBY: NOT_GRANTED, PRIMARY: NOT_GRANTED}, False, {}),
+])
+def test_spark_probe(errors, readable, served_by):
+    connector = spark_connector(STANDBY, errors)
+    assert connector.can_read("dba_tab_columns") == readable
+    assert connector.served_by == served_by
+    assert connector.queries_count == (1 if not errors else 2)
+
+
+# DATABASE_ROLE and OPEN_MODE of the standby, and if it takes the reads
+ROLES = [
+    (("PHYSICAL STANDBY", "READ ONLY WITH APPLY"), True),
+    (("SNAPSHOT STANDBY", "READ WRITE"), True),
+    (("PRIMARY", "READ ONLY"), True),
+    # A former standby after a switchover
+    (("PRIMARY", "READ WRITE"), False),
+    (None, False),
+]
+
+
+@pytest.mark.parametrize("role, serves", ROLES)
+def test_oracledb_check_standby(role, serves):
+    errors = {} if role else {STANDBY: STANDBY_DOWN}
+    connector = oracledb_connector(PRIMARY, errors, rows=[role])
+    assert connector._check_standby() == serves
+    assert connector.queries_count == 1
+
+
+@pytest.mark.parametrize("role, serves", ROLES)
+def test_spark_check_standby(role, serves):
+    errors = {} if role else {STANDBY: NOT_GRANTED}
+    rows = [SimpleNamespace(DATABASE_ROLE=role[0], OPEN_MODE=role[1])] \
+        if role else []
+    connector = spark_connector(PRIMARY, errors, rows=rows)
+    assert connector._check_standby() == serves
+    assert connector.queries_count == 1
+
+
+# Node of the run, errors of the nodes, and the node which serves the read
+ROUTES = [
+    (PRIMARY, {}, PRIMARY),
+    (STANDBY, {}, STANDBY),
+    (STANDBY, {STANDBY: STANDBY_DOWN}, PRIMARY),
+]
+
+
+@pytest.mark.parametrize("node, errors, served", ROUTES)
+def test_oracledb_execute(node, errors, served):
+    connector = oracledb_connector(node, errors, rows=[(1,), (2,), (3,)])
+    assert list(connector._execute("SELECT 1 FROM DUAL")) == [(1,), (2,), (3,)]
+    assert connector.served_by == {served: 1}
+    assert connector.queries_count == 1
+
+
+@pytest.mark.parametrize("node, errors, served", ROUTES)
+def test_spark_execute(node, errors, served):
+    connector = spark_connector(node, errors)
+    df = connector._execute("SELECT 1 FROM DUAL")
+    assert df.collect() == [(1,)]
+    assert connector.served_by == {served: 1}
+    assert connector.queries_count == 1
+
+
+def test_oracledb_fail_over():
+    connector = oracledb_connector(STANDBY, {STANDBY: NOT_GRANTED})
+    # The query is started on the standby, which fails while rows are fetched
+    with pytest.raises(RuntimeError):
+        list(connector._execute("SELECT 1 FROM DUAL"))
+    assert connector.fail_over()
+    assert list(connector._execute("SELECT 1 FROM DUAL")) == [(1,)]
+    assert connector.served_by == {PRIMARY: 1}
+    assert connector.repeated_reads == 1
+    assert connector.queries_count == 2
+    assert not connector.fail_over()
+
+
+def test_spark_fail_over():
+    connector = spark_connector(STANDBY, {STANDBY: NOT_GRANTED})
+    with pytest.raises(RuntimeError):
+        connector._execute("SELECT 1 FROM DUAL").collect()
+    assert connector.fail_over()
+    assert connector._execute("SELECT 1 FROM DUAL").collect() == [(1,)]
+    assert connector.served_by == {PRIMARY: 1}
+    assert connector.repeated_reads == 1
+    assert not connector.fail_over()
+
+
+@pytest.mark.parametrize("node, config, repeated", [
+    (STANDBY, {"write_mode": "driver", "stream_to_gcs": False}, True),
+    (PRIMARY, {"write_mode": "driver", "stream_to_gcs": False}, False),
+    # Uploaded entries can't be taken back
+    (STANDBY, {"write_mode": "distributed", "stream_to_gcs": False}, False),
+    (STANDBY, {"write_mode": "stream", "stream_to_gcs": True}, False),
+])
+def test_extraction_is_repeated_on_the_primary(monkeypatch, node, config,
+                                               repeated):
+    pytest.importorskip("pyspark")
+    from src import bootstrap
+    connector = oracledb_connector(node, {})
+    nodes = []
+
+    def extract(connector, config, folder, filename, checkpointed=False):
+        nodes.append(connector._node)
+        if len(nodes) == 1:
+            raise RuntimeError(STANDBY_DOWN)
+        return []
+
+    monkeypatch.setattr(bootstrap, "extract", extract)
+    if repeated:
+        assert bootstrap.extract_with_fallback(connector, config, "folder",
+                                               "oracle-output") == []
+        assert nodes == [STANDBY, PRIMARY]
+    else:
+        with pytest.raises(RuntimeError):
+            bootstrap.extract_with_fallback(connector, config, "folder",
+                                            "oracle-output")
+        assert nodes == [node]
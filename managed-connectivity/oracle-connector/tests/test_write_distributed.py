@@ -0,0 +1,32 @@
+"""The distributed writer describes its part files in the manifest."""
+import os
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+import google_crc32c
+
+import sharded_writer
+from src import bootstrap
+
+
+def test_shards_describe_part_files(spark, tmp_path):
+    output = tmp_path / "output"
+    datasets = [spark.createDataFrame([(f"T{i}", "é") for i in range(5)],
+                                      "name string, comment string")
+                .repartition(3),
+                spark.createDataFrame([], "name string")]
+    shards = bootstrap.write_distributed(f"file://{output}", ['{"top": 1}'],
+                                         datasets)
+
+    # The local filesystem of Hadoop adds .crc files next to the part files
+    assert [shard["name"] for shard in shards] == \
+        sorted(name for name in os.listdir(output) if name.startswith("part-"))
+    assert sum(shard["entries"] for shard in shards) == 6
+    for shard in shards:
+        data = (output / shard["name"]).read_bytes()
+        assert shard["entries"] == data.count(b"\n")
+        assert shard["bytes"] == len(data)
+        assert shard["crc32c"] == sharded_writer.encode_crc32c(
+            google_crc32c.Checksum(data))
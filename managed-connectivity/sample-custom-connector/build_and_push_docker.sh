@@ -6,6 +6,9 @@ PROJECT=<PROJECT_ID>
 
 REPO_IMAGE=us-central1-docker.pkg.dev/${PROJECT}/docker-repo/oracle-pyspark
 
+# Stage the modules shared between connectors into the build context
+rm -rf shared && cp -r ../src/shared shared
+
 docker build -t "${IMAGE}" .
 
 # Tag and push to GCP container registry
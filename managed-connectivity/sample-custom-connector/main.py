@@ -1,5 +1,16 @@
-from src import bootstrap
+import os
+import sys
+
+# Allow shared files to be found when running from command line
+SHARED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          '..', 'src', 'shared')
+sys.path.insert(1, SHARED_DIR)
+# Python workers of Spark don't get sys.path of the driver, but its
+# PYTHONPATH, e.g. to unpickle UDFs of the name builder
+os.environ["PYTHONPATH"] = os.pathsep.join(
+    filter(None, [SHARED_DIR, os.environ.get("PYTHONPATH")]))
 
+from src import bootstrap
 
 if __name__ == '__main__':
     bootstrap.run()
@@ -1,5 +1,7 @@
 """The entrypoint of a pipeline."""
-from typing import Dict
+import os
+import tempfile
+from typing import Dict, List
 
 from src.constants import EntryType
 from src import cmd_reader
@@ -9,6 +11,10 @@ from src import gcs_uploader
 from src import top_entry_builder
 from src.oracle_connector import OracleConnector
 
+# Shared between connectors, see managed-connectivity/src/shared
+import checkpoint
+import sharded_writer
+
 
 FILENAME = "output.jsonl"
 
@@ -36,12 +42,65 @@ def process_dataset(
     return df.toJSON().collect()
 
 
+def write_part(config: Dict[str, str], prefix: str, json_strings) -> List[Dict]:
+    """Writes a part of the run to own JSONL file and uploads it."""
+    # The local file is removed once it's uploaded
+    with tempfile.TemporaryDirectory() as local_dir:
+        writer = sharded_writer.ShardedJsonlWriter(
+            lambda name: open(os.path.join(local_dir, name), "wb"),
+            prefix, max_bytes=0)
+        with writer:
+            writer.write_all(json_strings)
+        for shard in writer.shards:
+            gcs_uploader.upload(config, os.path.join(local_dir, shard["name"]))
+    return writer.shards
+
+
+def write_checkpointed(connector: OracleConnector, config: Dict[str, str],
+                       top_lines: List[str], schemas: List[str]):
+    """Writes the top entries and every schema to own files, and records
+    the progress after each of them, so a resumed run skips them."""
+    path = checkpoint.progress_path(config["output_folder"])
+    progress = checkpoint.Checkpoint.loads(gcs_uploader.read_text(config, path))
+    prefix = FILENAME.removesuffix(".jsonl")
+
+    if not progress.top_completed:
+        progress.complete_top(write_part(config, prefix, top_lines))
+        gcs_uploader.write_text(config, path, progress.dumps())
+
+    for schema in progress.pending(schemas):
+        print(f"Processing tables and views for {schema}")
+        json_strings = process_dataset(connector, config, schema, EntryType.TABLE) \
+            + process_dataset(connector, config, schema, EntryType.VIEW)
+        shards = write_part(config, checkpoint.shard_prefix(prefix, schema),
+                            json_strings)
+        progress.complete_schema(schema, shards)
+        gcs_uploader.write_text(config, path, progress.dumps())
+
+    # The manifest is written last, so it only lists uploaded files
+    gcs_uploader.write_text(
+        config, sharded_writer.manifest_path(config["output_folder"]),
+        progress.manifest_json())
+
+
 def run():
     """Runs a pipeline."""
     config = cmd_reader.read_args()
     config["password"] = secret_manager.get_password(config["password_secret"])
     connector = OracleConnector(config)
 
+    if config["checkpoint"] or config["resume"]:
+        if config["resume"]:
+            # Output of the failed run is completed in its own folder
+            config["output_folder"] = config["resume"].rstrip("/")
+        top_entries = [top_entry_builder.create(config, EntryType.INSTANCE),
+                       top_entry_builder.create(config, EntryType.DATABASE)]
+        df_raw_schemas = connector.get_db_schemas()
+        schemas = [schema.USERNAME for schema in df_raw_schemas.select("USERNAME").collect()]
+        schemas_json = entry_builder.build_schemas(config, df_raw_schemas).toJSON().collect()
+        write_checkpointed(connector, config, top_entries + schemas_json, schemas)
+        return
+
     with open(FILENAME, "w", encoding="utf-8") as file:
         # Write top entries that don't require connection to the database
         file.writelines(top_entry_builder.create(config, EntryType.INSTANCE))
@@ -26,6 +26,15 @@ def read_args():
     parser.add_argument("--database", type=str, required=True,
         help="Source Oracle database.")
 
+    # Type mapping arguments
+    parser.add_argument("--type_mapping", type=str, required=False,
+        default="default", choices=["default", "pandas"],
+        help="default: built-in mapping of native types to metadata types. "
+             "pandas: vectorized mapping with regular expression rules")
+    parser.add_argument("--type_rules", type=str, required=False,
+        help="JSON file with [regex, metadata type] rules for the pandas "
+             "type mapping, which replace the built-in rules")
+
     # Google Cloud Storage arguments
     # It is assumed that the bucket is in the same region as the entry group
     parser.add_argument("--output_bucket", type=str, required=True,
@@ -33,4 +42,13 @@ def read_args():
     parser.add_argument("--output_folder", type=str, required=True,
         help="A folder in the Cloud Storage bucket, to write the generated metadata import files.")
 
+    # Checkpoint arguments
+    parser.add_argument("--checkpoint", action="store_true",
+        help="Write every schema to its own file and record the progress "
+             "next to the output folder after every schema, so a failed run "
+             "can be resumed")
+    parser.add_argument("--resume", type=str, required=False,
+        help="Output folder of a failed run with --checkpoint, used instead "
+             "of output_folder. Schemas already written to it are skipped")
+
     return vars(parser.parse_known_args()[0])
@@ -7,6 +7,14 @@ SOURCE_TYPE = "oracle"
 FORBIDDEN = "#"
 ALLOWED = "!"
 
+# Rules of the pandas type mapping: ordered pairs of a regular expression for
+# the whole Oracle native type and the metadata type. The first match wins.
+METADATA_TYPE_RULES = [
+    (r"NUMBER.*|FLOAT|LONG", "NUMBER"),
+    (r"VARCHAR.*|NVARCHAR2.*", "STRING"),
+    (r"DATE", "DATETIME"),
+]
+
 
 class EntryType(enum.Enum):
     """Types of Oracle entries."""
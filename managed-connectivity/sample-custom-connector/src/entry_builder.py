@@ -2,9 +2,12 @@
 import pyspark.sql.functions as F
 from pyspark.sql.types import StringType
 
-from src.constants import EntryType, SOURCE_TYPE
+from src.constants import EntryType, SOURCE_TYPE, METADATA_TYPE_RULES
 from src import name_builder as nb
 
+# Shared between connectors, see managed-connectivity/src/shared
+from type_mapping import create_metadata_type_pandas_udf, load_type_rules
+
 
 @F.udf(returnType=StringType())
 def choose_metadata_type_udf(data_type: str):
@@ -18,6 +21,14 @@ def choose_metadata_type_udf(data_type: str):
     return "OTHER"
 
 
+def choose_metadata_type_column(config, data_type):
+    """Creates metadataType column with the configured type mapping."""
+    if config.get("type_mapping") == "pandas":
+        return create_metadata_type_pandas_udf(
+            load_type_rules(config, METADATA_TYPE_RULES))(data_type)
+    return choose_metadata_type_udf(data_type)
+
+
 def create_entry_source(column):
     """Create Entry Source segment."""
     return F.named_struct(F.lit("display_name"),
@@ -62,14 +73,14 @@ def build_schemas(config, df_raw_schemas):
     entry_type = EntryType.DB_SCHEMA
     entry_aspect_name = nb.create_entry_aspect_name(config, entry_type)
 
+    names = nb.NameResolver(config)
+
     # For schema, parent name is the name of the database
-    parent_name =  nb.create_parent_name(config, entry_type)
+    parent_name = names.database_name
 
-    # Create user-defined function.
-    create_name_udf = F.udf(lambda x: nb.create_name(config, entry_type, x),
-                            StringType())
-    create_fqn_udf = F.udf(lambda x: nb.create_fqn(config, entry_type, x),
-                           StringType())
+    # Create user-defined function. Only the schema name is escaped per row
+    create_name_udf = F.udf(names.schema_name, StringType())
+    create_fqn_udf = F.udf(names.schema_fqn, StringType())
 
     # Fills the missed project and location into the entry type string
     full_entry_type = entry_type.value.format(
@@ -112,16 +123,18 @@ def build_dataset(config, df_raw, db_schema, entry_type):
       .withColumn("mode", F.when(F.col("NULLABLE") == 'Y', "NULLABLE").otherwise("REQUIRED")) \
       .drop("NULLABLE") \
       .withColumnRenamed("DATA_TYPE", "dataType") \
-      .withColumn("metadataType", choose_metadata_type_udf("dataType")) \
+      .withColumn("metadataType", choose_metadata_type_column(config, F.col("dataType"))) \
       .withColumnRenamed("COLUMN_NAME", "name")
 
     # The transformation below aggregate fields, denormalizing the table
     # TABLE_NAME becomes top-level filed, and the rest is put into
     # the array type called "fields"
+    # Repeated column rows, e.g. of a fan-out in the dictionary join, are
+    # dropped within every table, without another shuffle of the rows
     aspect_columns = ["name", "mode", "dataType", "metadataType"]
     df = df.withColumn("columns", F.struct(aspect_columns))\
       .groupby('TABLE_NAME') \
-      .agg(F.collect_list("columns").alias("fields"))
+      .agg(F.array_distinct(F.collect_list("columns")).alias("fields"))
 
     # Create nested structured called aspects.
     # Fields are becoming a part of a `schema` struct
@@ -144,14 +157,10 @@ def build_dataset(config, df_raw, db_schema, entry_type):
     df = df.select(F.col("TABLE_NAME"),
                    F.map_concat("schema", "entry_aspect").alias("aspects"))
 
-    # Define user-defined functions to fill the general information
-    # and hierarchy names
-    create_name_udf = F.udf(lambda x: nb.create_name(config, entry_type,
-                                                     db_schema, x),
-                            StringType())
-
-    create_fqn_udf = F.udf(lambda x: nb.create_fqn(config, entry_type,
-                                                   db_schema, x), StringType())
+    # Prefixes of the hierarchy names are the same for every table of
+    # the schema, so names are concatenated without user-defined functions
+    name_prefix, fqn_prefix = nb.NameResolver(config).dataset_prefixes(
+        entry_type, db_schema)
 
     parent_name = nb.create_parent_name(entry_type, db_schema)
     full_entry_type = entry_type.value.format(
@@ -160,8 +169,8 @@ def build_dataset(config, df_raw, db_schema, entry_type):
 
     # Fill the top-level fields
     column = F.col("TABLE_NAME")
-    df = df.withColumn("name", create_name_udf(column)) \
-      .withColumn("fully_qualified_name", create_fqn_udf(column)) \
+    df = df.withColumn("name", F.concat(F.lit(name_prefix), column)) \
+      .withColumn("fully_qualified_name", F.concat(F.lit(fqn_prefix), column)) \
       .withColumn("entry_type", F.lit(full_entry_type)) \
       .withColumn("parent_entry", F.lit(parent_name)) \
       .withColumn("entry_source", create_entry_source(column)) \
@@ -1,13 +1,24 @@
-"""Sends files to GCP storage."""
-from typing import Dict
-from google.cloud import storage
+"""Sends files to the output bucket: GCP storage, or a local or in-memory
+sink for debugging and tests, selected by the scheme of output_bucket."""
+from typing import Dict, Optional
+
+# Shared between connectors, see managed-connectivity/src/shared
+import output_sink
 
 
 def upload(config: Dict[str, str], filename: str):
-    """Uploads a file to GCP bucket."""
-    client = storage.Client()
-    bucket = client.get_bucket(config["output_bucket"])
+    """Uploads a file to the output bucket."""
+    sink = output_sink.create_sink(config["output_bucket"])
     folder = config["output_folder"]
 
-    blob = bucket.blob(f"{folder}/{filename}")
-    blob.upload_from_filename(filename)
+    sink.upload_files([filename], folder)
+
+
+def read_text(config: Dict[str, str], path: str) -> Optional[str]:
+    """Reads a small text file from the output bucket, None if it doesn't exist."""
+    return output_sink.create_sink(config["output_bucket"]).read_text(path)
+
+
+def write_text(config: Dict[str, str], path: str, text: str):
+    """Writes a small text file to the output bucket."""
+    output_sink.create_sink(config["output_bucket"]).write_text(path, text)
@@ -2,6 +2,9 @@
 from typing import Dict
 from src.constants import EntryType, SOURCE_TYPE
 
+# Shared between connectors, see managed-connectivity/src/shared
+import name_resolver
+
 
 # Oracle cluster users start with C## prefix, but Dataplex doesn't accept #.
 # In that case in names it is changed to C!!, and escaped with backticks in FQNs
@@ -9,11 +12,22 @@ FORBIDDEN_SYMBOL = "#"
 ALLOWED_SYMBOL = "!"
 
 
+def escape_name(schema_name: str) -> str:
+    """Escapes a schema name within Dataplex v2 hierarchy names."""
+    return schema_name.replace(FORBIDDEN_SYMBOL, ALLOWED_SYMBOL)
+
+
+def escape_fqn(schema_name: str) -> str:
+    """Escapes a schema name within fully qualified names."""
+    if FORBIDDEN_SYMBOL in schema_name:
+        return f"`{schema_name}`"
+    return schema_name
+
+
 def create_fqn(config: Dict[str, str], entry_type: EntryType,
                schema_name: str = "", table_name: str = ""):
     """Creates a fully qualified name or Dataplex v1 hierarchy name."""
-    if FORBIDDEN_SYMBOL in schema_name:
-        schema_name = f"`{schema_name}`"
+    schema_name = escape_fqn(schema_name)
 
     if entry_type == EntryType.INSTANCE:
         # Requires backticks to escape column
@@ -33,8 +47,7 @@ def create_fqn(config: Dict[str, str], entry_type: EntryType,
 def create_name(config: Dict[str, str], entry_type: EntryType,
                 schema_name: str = "", table_name: str = ""):
     """Creates a Dataplex v2 hierarchy name."""
-    if FORBIDDEN_SYMBOL in schema_name:
-        schema_name = schema_name.replace(FORBIDDEN_SYMBOL, ALLOWED_SYMBOL)
+    schema_name = escape_name(schema_name)
     if entry_type == EntryType.INSTANCE:
         name_prefix = (
             f"projects/{config['target_project_id']}/"
@@ -74,3 +87,12 @@ def create_entry_aspect_name(config: Dict[str, str], entry_type: EntryType):
     """Generates an entry aspect name."""
     last_segment = entry_type.value.split("/")[-1]
     return f"{config['target_project_id']}.{config['target_location_id']}.{last_segment}"
+
+
+class NameResolver(name_resolver.NameResolver):
+    """Builds the hierarchy names of a run from prefixes computed once,
+    the same names as create_name and create_fqn build."""
+
+    def __init__(self, config: Dict[str, str]):
+        super().__init__(config, EntryType, create_name, create_fqn,
+                         escape_name, escape_fqn)
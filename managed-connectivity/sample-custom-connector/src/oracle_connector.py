@@ -39,12 +39,15 @@ class OracleConnector:
         """Gets a list of columns in tables or views in a batch."""
         # Every line here is a column that belongs to the table or to the view.
         # This SQL gets data from ALL the tables in a given schema.
+        # Objects are joined on the owner too, otherwise the columns of a
+        # table repeat for every schema with an object of the same name
         return (f"SELECT col.TABLE_NAME, col.COLUMN_NAME, "
                 f"col.DATA_TYPE, col.NULLABLE "
                 f"FROM all_tab_columns col "
                 f"INNER JOIN DBA_OBJECTS tab "
-                f"ON tab.OBJECT_NAME = col.TABLE_NAME "
-                f"WHERE tab.OWNER = '{schema_name}' "
+                f"ON tab.OWNER = col.OWNER "
+                f"AND tab.OBJECT_NAME = col.TABLE_NAME "
+                f"WHERE col.OWNER = '{schema_name}' "
                 f"AND tab.OBJECT_TYPE = '{object_type}'")
 
     def get_dataset(self, schema_name: str, entry_type: EntryType):
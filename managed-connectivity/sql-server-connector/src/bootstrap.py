@@ -1,5 +1,9 @@
 """The entrypoint of a pipeline."""
-from typing import Dict
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Dict, List
 import sys
 
 from datetime import datetime
@@ -12,16 +16,18 @@ from src import entry_builder
 from src import gcs_uploader
 from src import top_entry_builder
 from src.sqlserver_connector import SQLServerConnector
+from src.snapshot_connector import SnapshotConnector
 
-def write_jsonl(output_file, json_strings):
-    """Writes a list of string to the file in JSONL format."""
+# Shared between connectors, see managed-connectivity/src/shared
+import checkpoint
+import entry_diff
+import sharded_writer
 
-    # For simplicity, dataset is written into the one file. But it is not
-    # mandatory, and the order doesn't matter for Import API.
-    # The PySpark itself could dump entries into many smaller JSONL files.
-    # Due to performance, it's recommended to dump to many smaller files.
-    for string in json_strings:
-        output_file.write(string + "\n")
+def keep_changed(diff, json_strings):
+    """Drops entries unchanged since the previous run, if diffing is on."""
+    if diff is None:
+        return json_strings
+    return list(diff.changed(json_strings))
 
 
 def process_dataset(
@@ -36,10 +42,89 @@ def process_dataset(
     return df.toJSON().collect()
 
 
+@lru_cache(maxsize=None)
+def local_dir() -> str:
+    """Gets the temporary folder of the local shards, created once per run."""
+    return tempfile.mkdtemp(prefix=f"{SOURCE_TYPE}-output-")
+
+
+def create_writer(config: Dict[str, str], prefix: str):
+    """Creates a writer of shards with names starting with the prefix."""
+    # Output files are streamed to the bucket or written locally and uploaded
+    if config["stream_to_gcs"]:
+        opener = gcs_uploader.opener(config, config["output_folder"])
+    else:
+        opener = lambda name: open(os.path.join(local_dir(), name), "wb")
+    return sharded_writer.ShardedJsonlWriter(
+        opener, prefix,
+        max_entries=config["max_shard_entries"],
+        max_bytes=config["max_shard_bytes"])
+
+
+def publish_shards(config: Dict[str, str], shards: List[Dict]):
+    """Uploads the local shards to the output folder, or verifies streamed ones."""
+    # Files are uploaded to the output folder given in the arguments
+    if config["stream_to_gcs"]:
+        gcs_uploader.verify_shards(config, shards, config["output_folder"])
+        return
+    filenames = [os.path.join(local_dir(), shard["name"]) for shard in shards]
+    gcs_uploader.upload_many(config, filenames, config["output_folder"])
+    # Uploaded files are removed, so a run over many schemas doesn't
+    # fill the local disk
+    for filename in filenames:
+        os.remove(filename)
+
+
+def write_checkpointed(connector: SQLServerConnector, config: Dict[str, str],
+                       filename: str, top_lines: List[str], schemas: List[str]):
+    """Writes the top entries and every schema to own shards, and records
+    the progress after each of them, so a resumed run skips them.
+    Returns:
+        Checkpoint with the shards of all the parts.
+    """
+    path = checkpoint.progress_path(config["output_folder"])
+    progress = checkpoint.Checkpoint.loads(gcs_uploader.read_text(config, path))
+
+    def write_part(prefix: str, lines) -> List[Dict]:
+        with create_writer(config, prefix) as writer:
+            writer.write_all(lines)
+        publish_shards(config, writer.shards)
+        return writer.shards
+
+    def schema_lines(schema: str):
+        print(f"Processing tables for {schema}")
+        yield from process_dataset(connector, config, schema, EntryType.TABLE)
+        print(f"Processing views for {schema}")
+        yield from process_dataset(connector, config, schema, EntryType.VIEW)
+
+    if progress.top_completed:
+        print("Top entries and schemas are already written")
+    else:
+        progress.complete_top(write_part(filename, top_lines))
+        gcs_uploader.write_text(config, path, progress.dumps())
+
+    pending = progress.pending(schemas)
+    print(f"{len(schemas) - len(pending)} schemas are already written, "
+          f"{len(pending)} left")
+    for schema in pending:
+        shards = write_part(checkpoint.shard_prefix(filename, schema),
+                            schema_lines(schema))
+        progress.complete_schema(schema, shards)
+        gcs_uploader.write_text(config, path, progress.dumps())
+    return progress
+
+
 def run():
     """Runs a pipeline."""
     config = cmd_reader.read_args()
 
+    checkpointed = config["checkpoint"] or bool(config["resume"])
+    if checkpointed and config["changed_only"]:
+        # The hash index is saved for the output of the whole run
+        print("Checkpoints are not supported with changed_only")
+        print("Exiting")
+        sys.exit()
+
     if not gcs_uploader.checkDestination(config):
         print("Exiting")
         sys.exit()
@@ -50,18 +135,24 @@ def run():
     """Build the default output filename"""
     FILENAME = SOURCE_TYPE + "-output.jsonl"
 
+    if config["resume"]:
+        # Output of the failed run is completed in its own folder
+        config["output_folder"] = config["resume"].rstrip("/")
+
     print(f"output folder is {FOLDERNAME}")
 
-    try:
-        config["password"] = secret_manager.get_password(config["password_secret"])
-    except Exception as ex:
-        print(ex)
-        print("Exiting")
-        sys.exit()
+    if config["from_snapshot"]:
+        # Replayed without the database, so the password is not needed
+        connector = SnapshotConnector(config)
+    else:
+        try:
+            config["password"] = secret_manager.get_password(config["password_secret"])
+        except Exception as ex:
+            print(ex)
+            print("Exiting")
+            sys.exit()
 
-    connector = SQLServerConnector(config)
-    schemas_count = 0
-    entries_count = 0
+        connector = SQLServerConnector(config)
 
     # Build the output file name from connection details
     if config['instancename'] and len(config['instancename']) > 0:
@@ -69,29 +160,56 @@ def run():
     else:
         FILENAME = f"sqlserver-output-DEFAULT"
 
-    with open(FILENAME, "w", encoding="utf-8") as file:
-        # Write top entries that don't require connection to the database
-        file.writelines(top_entry_builder.create(config, EntryType.INSTANCE))
-        file.writelines("\n")
-        file.writelines(top_entry_builder.create(config, EntryType.DATABASE))
-
-        # Get schemas, write them and collect to the list
-        df_raw_schemas = connector.get_db_schemas()
-        schemas = [schema.SCHEMA_NAME for schema in df_raw_schemas.select("SCHEMA_NAME").collect()]
-        schemas_json = entry_builder.build_schemas(config, df_raw_schemas).toJSON().collect()
-
-        write_jsonl(file, schemas_json)
-
-        # Ingest tables and views for every schema in a list
-        for schema in schemas:
-            print(f"Processing tables for {schema}")
-            tables_json = process_dataset(connector, config, schema, EntryType.TABLE)
-            entries_count += len(tables_json)
-            write_jsonl(file, tables_json)
-            print(f"Processing views for {schema}")
-            views_json = process_dataset(connector, config, schema, EntryType.VIEW)
-            entries_count += len(views_json)
-            write_jsonl(file, views_json)
-
-    print(f"{schemas_count + entries_count} rows written to file") 
-    gcs_uploader.upload(config, FILENAME,FOLDERNAME)
+    # Entries unchanged since the previous run are skipped with a hash index
+    diff = None
+    if config["changed_only"]:
+        index_path = f"{SOURCE_TYPE}/state/{FILENAME}-hashes.json"
+        diff = entry_diff.EntryDiff(
+            entry_diff.HashIndex.loads(gcs_uploader.read_text(config, index_path)))
+
+    # Top entries don't require connection to the database
+    top_entries = [top_entry_builder.create(config, EntryType.INSTANCE),
+                   top_entry_builder.create(config, EntryType.DATABASE)]
+
+    # Get schemas and collect them to the list
+    df_raw_schemas = connector.get_db_schemas()
+    schemas = [schema.SCHEMA_NAME for schema in df_raw_schemas.select("SCHEMA_NAME").collect()]
+    schemas_json = entry_builder.build_schemas(config, df_raw_schemas).toJSON().collect()
+
+    if checkpointed:
+        progress = write_checkpointed(connector, config, FILENAME,
+                                      top_entries + schemas_json, schemas)
+        print(f"{progress.manifest()['entries']} rows written to "
+              f"{len(progress.shards)} files")
+        manifest_json = progress.manifest_json()
+    else:
+        writer = create_writer(config, FILENAME)
+        with writer:
+            writer.write_all(keep_changed(diff, top_entries))
+            writer.write_all(keep_changed(diff, schemas_json))
+
+            # Ingest tables and views for every schema in a list
+            for schema in schemas:
+                print(f"Processing tables for {schema}")
+                writer.write_all(keep_changed(diff, process_dataset(connector, config, schema, EntryType.TABLE)))
+                print(f"Processing views for {schema}")
+                writer.write_all(keep_changed(diff, process_dataset(connector, config, schema, EntryType.VIEW)))
+
+        print(f"{writer.entries_count} rows written to {len(writer.shards)} files")
+        publish_shards(config, writer.shards)
+        manifest_json = writer.manifest_json()
+
+    # The manifest is written last, so it only lists uploaded shards
+    gcs_uploader.write_text(config, sharded_writer.manifest_path(config["output_folder"]),
+                            manifest_json)
+
+    if diff is not None:
+        # Saved only when the output is uploaded, so a failed run is repeated
+        print(f"{diff.unchanged_count} unchanged entries skipped")
+        gcs_uploader.write_text(config, index_path, diff.current.dumps())
+        tombstones = diff.tombstones()
+        print(f"{len(tombstones)} entries removed since the previous run")
+        # Written even if empty, so tombstones of a former run aren't kept
+        gcs_uploader.write_text(
+            config, f"{SOURCE_TYPE}/state/{FILENAME}-tombstones.json",
+            json.dumps(tombstones))
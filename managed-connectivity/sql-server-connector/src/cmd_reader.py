@@ -23,14 +23,48 @@ def read_args():
         help="The SQL Server host server")
     parser.add_argument("--port", type=str, required=True,
         help="The port number (usually 1433)")
-    parser.add_argument("--user", type=str, required=True, help="SQL Server User")
-    parser.add_argument("--password-secret", type=str, required=True,
-        help="Resource name in the Google Cloud Secret Manager for the SQL Server password")
+    parser.add_argument("--user", type=str, required=False,
+        help="SQL Server User. Required unless --from_snapshot is given")
+    parser.add_argument("--password-secret", type=str, required=False,
+        help="Resource name in the Google Cloud Secret Manager for the SQL Server "
+             "password. Required unless --from_snapshot is given")
     parser.add_argument("--instancename", type=str,required=False,
         help="The name of the SQL Server database to extract metadata from")
     parser.add_argument("--database", type=str,required=True,
         help="Databases")
 
+    # Type mapping arguments
+    parser.add_argument("--type_mapping", type=str, required=False,
+        default="default", choices=["default", "pandas"],
+        help="default: built-in mapping of native types to metadata types. "
+             "pandas: vectorized mapping with regular expression rules")
+    parser.add_argument("--type_rules", type=str, required=False,
+        help="JSON file with [regex, metadata type] rules for the pandas "
+             "type mapping, which replace the built-in rules")
+
+    # Snapshot arguments
+    parser.add_argument("--snapshot", type=str, required=False,
+        default="none", choices=["none", "parquet"],
+        help="parquet: save results of the catalog queries as Parquet files "
+             "in snapshot_dir, to be replayed with --from_snapshot")
+    parser.add_argument("--snapshot_dir", type=str, required=False,
+        default="snapshot",
+        help="Folder of the Parquet snapshots. Local, unless a scheme like "
+             "gs:// is given")
+    parser.add_argument("--from_snapshot", action="store_true",
+        help="Build the entries from the Parquet snapshots in snapshot_dir, "
+             "saved by a run with --snapshot parquet, without connecting "
+             "to the database")
+
+    # Checkpoint arguments
+    parser.add_argument("--checkpoint", action="store_true",
+        help="Write every schema to its own files and record the progress "
+             "next to the output folder after every schema, so a failed run "
+             "can be resumed")
+    parser.add_argument("--resume", type=str, required=False,
+        help="Output folder of a failed run with --checkpoint, used instead "
+             "of output_folder. Schemas already written to it are skipped")
+
     # Google Cloud Storage arguments
     # It is assumed that the bucket is in the same region as the entry group
     parser.add_argument("--output_bucket", type=str, required=True,
@@ -38,8 +72,30 @@ def read_args():
     parser.add_argument("--output_folder", type=str, required=True,
         help="The folder within the Cloud Storage bucket, to write the generated metadata import files. Name only required")
 
+    parser.add_argument("--changed_only", action="store_true",
+        help="Write only entries which are new or changed since the previous "
+             "run with this flag, based on a hash index kept in the bucket")
+    parser.add_argument("--stream_to_gcs", action="store_true",
+        help="Stream output files directly to the bucket, without local files")
+    parser.add_argument("--upload_chunk_size", type=int, required=False, default=16,
+        help="Chunk size in MiB of streamed uploads, buffered in memory for "
+             "the open output file. Default 16")
+    parser.add_argument("--upload_workers", type=int, required=False, default=8,
+        help="Number of output files uploaded concurrently")
+    parser.add_argument("--max_shard_entries", type=int, required=False, default=0,
+        help="Start a new output file after this number of entries. "
+             "Default 0 means no limit")
+    parser.add_argument("--max_shard_bytes", type=int, required=False,
+        default=100 * 1024 * 1024,
+        help="Start a new output file after this number of bytes. "
+             "Default 100 MiB, 0 means no limit")
+
     # Development arguments
     parser.add_argument("--testing", type=str, required=False,
     help="Test mode")
     
-    return vars(parser.parse_known_args()[0])
+    args = parser.parse_known_args()[0]
+    # Connection credentials are not used to replay a snapshot
+    if not args.from_snapshot and not (args.user and args.password_secret):
+        parser.error("--user and --password-secret are required")
+    return vars(args)
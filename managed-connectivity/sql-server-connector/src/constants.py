@@ -7,6 +7,16 @@ SOURCE_TYPE = "sqlserver"
 FORBIDDEN = "#"
 ALLOWED = "!"
 
+# Rules of the pandas type mapping: ordered pairs of a regular expression for
+# the whole SQL Server native type and the metadata type. The first match wins.
+METADATA_TYPE_RULES = [
+    (r"bigint|int|smallint|tinyint|decimal|numeric|smallmoney|money|float|real", "NUMBER"),
+    (r"varchar|nvarchar|char|nchar|text|ntext|xml", "STRING"),
+    (r"binary|varbinary|image|geography|geometry", "BYTES"),
+    (r"date|datetime|datetime2|smalldatetime|datetimeoffset", "DATETIME"),
+    (r"time", "TIME"),
+]
+
 
 class EntryType(enum.Enum):
     """Types of SQL Server entries."""
@@ -0,0 +1,30 @@
+"""Reads the SQL Server catalog from a Parquet snapshot using PySpark."""
+from typing import Dict
+from pyspark.sql import SparkSession, DataFrame
+
+from src.constants import EntryType
+from src.sqlserver_connector import snapshot_path
+
+
+class SnapshotConnector:
+    """Reads data saved by a run with --snapshot parquet and returns Spark
+    Dataframes, the same as SQLServerConnector reads them from the database.
+    """
+
+    def __init__(self, config: Dict[str, str]):
+        # PySpark entrypoint
+        self._spark = SparkSession.builder.appName("SQLServerSnapshotReplay") \
+            .getOrCreate()
+        self._config = config
+
+    def _read(self, name: str) -> DataFrame:
+        """Reads one snapshot saved by SQLServerConnector."""
+        return self._spark.read.parquet(snapshot_path(self._config, name))
+
+    def get_db_schemas(self) -> DataFrame:
+        """Gets a list of schemas in the database"""
+        return self._read("schemas")
+
+    def get_dataset(self, schema_name: str, entry_type: EntryType):
+        """Gets data for a table or a view."""
+        return self._read(f"columns/{schema_name}/{entry_type.name}")
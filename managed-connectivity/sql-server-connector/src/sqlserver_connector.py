@@ -1,4 +1,5 @@
 """Reads SQL Server using PySpark."""
+import os
 from typing import Dict
 from pyspark.sql import SparkSession, DataFrame
 
@@ -7,6 +8,15 @@ from src.constants import EntryType
 SPARK_JAR_PATH = "/opt/spark/jars/mssql-jdbc-9.4.1.jre8.jar"
 SPARK_JAR_PATH = "./mssql-jdbc.jar"
 
+
+def snapshot_path(config: Dict[str, str], name: str) -> str:
+    """Gets the Parquet path of a snapshot, local if no scheme is given."""
+    snapshot_dir = config.get("snapshot_dir") or "snapshot"
+    if "://" not in snapshot_dir:
+        snapshot_dir = "file://" + os.path.abspath(snapshot_dir)
+    return f"{snapshot_dir}/{name}"
+
+
 class SQLServerConnector:
     """Reads data from SQL Server and returns Spark Dataframes."""
 
@@ -23,9 +33,12 @@ class SQLServerConnector:
         else:
             self._url = f"jdbc:sqlserver://{config['host']}:{config['port']}"
 
-    def _execute(self, query: str) -> DataFrame:
-        """A generic method to execute any query."""
-        return self._spark.read.format("jdbc") \
+    def _execute(self, query: str, name: str = "") -> DataFrame:
+        """A generic method to execute any query.
+        Args:
+            name - name of the Parquet snapshot of the result
+        """
+        df = self._spark.read.format("jdbc") \
             .option("driver", "com.microsoft.sqlserver.jdbc.SQLServerDriver") \
             .option("url", self._url) \
             .option("query", query) \
@@ -33,6 +46,12 @@ class SQLServerConnector:
             .option("password", self._config["password"]) \
             .option("trustServerCertificate","true") \
             .load()
+        if name and self._config.get("snapshot") == "parquet":
+            # Saved for the replay with --from_snapshot
+            path = snapshot_path(self._config, name)
+            df.write.mode("overwrite").parquet(path)
+            return self._spark.read.parquet(path)
+        return df
 
     def get_db_schemas(self) -> DataFrame:
         """Gets a list of schemas in the database"""
@@ -41,7 +60,7 @@ class SQLServerConnector:
         FROM sys.schemas s
         WHERE s.name NOT in ('db_accessadmin','db_backupoperator','db_datareader','db_datawriter','db_ddladmin','db_denydatareader','db_denydatawriter','db_owner','db_securityadmin','guest','sys','INFORMATION_SCHEMA')
         """
-        return self._execute(query)
+        return self._execute(query, name="schemas")
 
     def _get_columns(self, schema_name: str, object_type: str) -> str:
         """Gets a list of columns in tables or views."""
@@ -63,4 +82,4 @@ class SQLServerConnector:
         # Dataset means that these entities can contain end user data.
         short_type = {"TABLE":"U", "VIEW":"V"}
         query = self._get_columns(schema_name, short_type[entry_type.name])
-        return self._execute(query)
+        return self._execute(query, name=f"columns/{schema_name}/{entry_type.name}")
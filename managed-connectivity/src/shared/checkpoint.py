@@ -0,0 +1,95 @@
+"""Per-schema progress of a run, so a failed extraction can be resumed."""
+import json
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+
+def progress_path(folder: str) -> str:
+    """Gets the path of the progress record of an output folder.
+
+    The record is kept next to the folder, the same as the manifest,
+    because an import job reads every file of the folder as import items.
+    """
+    return f"{folder.rstrip('/')}.progress.json"
+
+
+def shard_prefix(prefix: str, schema: str) -> str:
+    """Gets the prefix of the shards of a schema, safe in object names."""
+    return f"{prefix}-{quote(schema, safe='')}"
+
+
+class Checkpoint:
+    """Shards of the completed parts of a run.
+
+    A run is split into the top part, with the entries which don't depend
+    on a schema, and a part per schema. A part is recorded as completed
+    only after its shards are uploaded, so a resumed run skips it and
+    keeps its shards. The shards of a part which didn't complete are
+    written again under the same names.
+
+    Usage:
+        checkpoint = Checkpoint.loads(read_text(progress_path(folder)))
+        for schema in checkpoint.pending(schemas):
+            with ShardedJsonlWriter(opener, shard_prefix(prefix, schema)) as writer:
+                writer.write_all(json_strings)
+            upload(writer.shards)
+            checkpoint.complete_schema(schema, writer.shards)
+            write_text(progress_path(folder), checkpoint.dumps())
+        write_text(manifest_path(folder), checkpoint.manifest_json())
+    """
+
+    def __init__(self, top: Optional[List[Dict]] = None,
+                 schemas: Optional[Dict[str, List[Dict]]] = None):
+        self.top = top
+        self.schemas = dict(schemas or {})
+
+    @classmethod
+    def loads(cls, text: Optional[str]) -> "Checkpoint":
+        """Reads a record saved by dumps(). None means a new run."""
+        if not text:
+            return cls()
+        record = json.loads(text)
+        return cls(record.get("top"), record.get("schemas"))
+
+    def dumps(self) -> str:
+        """Serializes the record to JSON."""
+        return json.dumps({"top": self.top, "schemas": self.schemas}, indent=2)
+
+    @property
+    def top_completed(self) -> bool:
+        """Whether the shards of the top part are uploaded."""
+        return self.top is not None
+
+    def complete_top(self, shards: List[Dict]):
+        """Records the uploaded shards of the top part."""
+        self.top = list(shards)
+
+    def pending(self, schemas: Iterable[str]) -> List[str]:
+        """Selects the schemas which are not completed yet."""
+        return [schema for schema in schemas if schema not in self.schemas]
+
+    def complete_schema(self, schema: str, shards: List[Dict]):
+        """Records the uploaded shards of a schema."""
+        self.schemas[schema] = list(shards)
+
+    @property
+    def shards(self) -> List[Dict]:
+        """Shards of all completed parts."""
+        shards = list(self.top or [])
+        for schema_shards in self.schemas.values():
+            shards.extend(schema_shards)
+        return shards
+
+    def manifest(self) -> Dict:
+        """Describes the shards of all completed parts, the same way as
+        ShardedJsonlWriter.manifest() describes the shards of one writer."""
+        shards = self.shards
+        return {
+            "entries": sum(shard["entries"] for shard in shards),
+            "bytes": sum(shard["bytes"] for shard in shards),
+            "shards": shards,
+        }
+
+    def manifest_json(self) -> str:
+        """Serializes the manifest to JSON."""
+        return json.dumps(self.manifest(), indent=2)
@@ -0,0 +1,78 @@
+"""Content-hash diffing of import items between connector runs."""
+import hashlib
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+# Import items are accepted as dicts or as JSON strings, e.g. from Spark
+ImportItem = Union[dict, str]
+
+
+def canonical_json(item: dict) -> str:
+    """Serializes an import item independently of the order of keys."""
+    return json.dumps(item, sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False)
+
+
+def digest(item: dict) -> str:
+    """Gets a stable hash of an import item."""
+    return hashlib.blake2b(canonical_json(item).encode("utf-8"),
+                           digest_size=16).hexdigest()
+
+
+def entry_key(item: dict) -> Optional[str]:
+    """Gets the identifier of an import item: entry name or FQN."""
+    entry = item.get("entry") or {}
+    return entry.get("name") or entry.get("fully_qualified_name")
+
+
+class HashIndex:
+    """Digests of the import items of a run, keyed by the entry name."""
+
+    def __init__(self, digests: Optional[Dict[str, str]] = None):
+        self.digests = dict(digests or {})
+
+    @classmethod
+    def loads(cls, text: Optional[str]) -> "HashIndex":
+        """Reads an index saved by dumps(). None means an empty index."""
+        return cls(json.loads(text) if text else {})
+
+    def dumps(self) -> str:
+        """Serializes the index to compact JSON."""
+        return json.dumps(self.digests, sort_keys=True, separators=(",", ":"))
+
+
+class EntryDiff:
+    """Skips import items which are unchanged since the previous run.
+
+    Usage:
+        diff = EntryDiff(HashIndex.loads(previous_index_text))
+        write_jsonl(file, diff.changed(items))
+        save(diff.current.dumps())
+        save(json.dumps(diff.tombstones()))
+    """
+
+    def __init__(self, previous: HashIndex):
+        self._previous = previous
+        self.current = HashIndex()
+        self.unchanged_count = 0
+
+    def changed(self, items: Iterable[ImportItem]) -> Iterator[ImportItem]:
+        """Yields new or changed items in the same form they are passed."""
+        for item in items:
+            parsed = json.loads(item) if isinstance(item, str) else item
+            key = entry_key(parsed)
+            if key is None:
+                # Items without a name can't be tracked, so they are kept
+                yield item
+                continue
+
+            item_digest = digest(parsed)
+            self.current.digests[key] = item_digest
+            if self._previous.digests.get(key) == item_digest:
+                self.unchanged_count += 1
+                continue
+            yield item
+
+    def tombstones(self) -> List[str]:
+        """Names of the entries of the previous run which are gone."""
+        return sorted(set(self._previous.digests) - set(self.current.digests))
@@ -0,0 +1,103 @@
+"""Concurrent uploads of output files to GCS with checksum verification.
+
+Set STORAGE_EMULATOR_HOST, e.g. to http://localhost:4443, to run the
+uploads against a local fake GCS server. The storage client then uses
+anonymous credentials.
+"""
+import functools
+import os
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+import google_crc32c
+from google.cloud import storage
+from google.cloud.storage import transfer_manager
+
+from sharded_writer import ChecksumMismatchError, encode_crc32c
+
+DEFAULT_MAX_WORKERS = 8
+# Files larger than this are uploaded in chunks in parallel
+COMPOSITE_UPLOAD_THRESHOLD = 256 * 1024 * 1024
+COMPOSITE_CHUNK_SIZE = 32 * 1024 * 1024
+# Streamed objects are sent in resumable upload chunks of this size. It's
+# also the memory buffered for every open object, a multiple of 256 KiB.
+DEFAULT_STREAM_CHUNK_SIZE = 16 * 1024 * 1024
+_READ_BLOCK_SIZE = 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(project: Optional[str] = None) -> storage.Client:
+    """Gets a storage client, created once per project and reused."""
+    if project is None:
+        return storage.Client()
+    return storage.Client(project=project)
+
+
+def file_crc32c(filename: str) -> str:
+    """Gets CRC32C of a file, encoded as in the metadata of GCS objects."""
+    checksum = google_crc32c.Checksum()
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(_READ_BLOCK_SIZE), b""):
+            checksum.update(block)
+    return encode_crc32c(checksum)
+
+
+def verify(blobs: Dict[str, storage.Blob]):
+    """Checks uploaded objects against CRC32C of their local files."""
+    for filename, blob in blobs.items():
+        blob.reload()
+        expected = file_crc32c(filename)
+        if blob.crc32c != expected:
+            raise ChecksumMismatchError(
+                f"gs://{blob.bucket.name}/{blob.name} has CRC32C "
+                f"{blob.crc32c}, local file {filename} has {expected}")
+
+
+def blob_opener(bucket_name: str, folder: str,
+                chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+                project: Optional[str] = None) -> Callable[[str], BinaryIO]:
+    """Gets a function opening objects of a folder for streamed writing."""
+    bucket = get_client(project).bucket(bucket_name)
+    return lambda name: bucket.blob(f"{folder}/{name}").open(
+        "wb", chunk_size=chunk_size)
+
+
+def verify_shards(bucket: storage.Bucket, folder: str, shards: List[Dict]):
+    """Checks objects written from a stream against their manifest shards."""
+    for shard in shards:
+        blob = bucket.get_blob(f"{folder}/{shard['name']}")
+        if blob is None or blob.crc32c != shard["crc32c"]:
+            raise ChecksumMismatchError(
+                f"gs://{bucket.name}/{folder}/{shard['name']} doesn't match "
+                f"CRC32C {shard['crc32c']} of the written content")
+
+
+def upload_files(bucket_name: str, filenames: List[str], folder: str,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 project: Optional[str] = None) -> Dict[str, storage.Blob]:
+    """Uploads local files to a bucket folder concurrently.
+
+    Files are uploaded with their base names. Large files are split into
+    chunks uploaded in parallel. Every object is verified with CRC32C.
+    """
+    bucket = get_client(project).bucket(bucket_name)
+    blobs = {filename: bucket.blob(f"{folder}/{os.path.basename(filename)}")
+             for filename in filenames}
+
+    small = [(filename, blob) for filename, blob in blobs.items()
+             if os.path.getsize(filename) < COMPOSITE_UPLOAD_THRESHOLD]
+    large = [(filename, blob) for filename, blob in blobs.items()
+             if os.path.getsize(filename) >= COMPOSITE_UPLOAD_THRESHOLD]
+
+    if small:
+        # Threads share the client, processes would have to pickle it
+        transfer_manager.upload_many(
+            small, max_workers=max_workers, raise_exception=True,
+            worker_type=transfer_manager.THREAD)
+
+    for filename, blob in large:
+        transfer_manager.upload_chunks_concurrently(
+            filename, blob, chunk_size=COMPOSITE_CHUNK_SIZE,
+            max_workers=max_workers, worker_type=transfer_manager.THREAD)
+
+    verify(blobs)
+    return blobs
@@ -0,0 +1,100 @@
+"""Hierarchy names of a run, built from prefixes computed once.
+
+Every connector has its own recursive create_name and create_fqn functions
+in its name_builder.py, and its own escaping of schema names. The resolver
+builds the same names, but the common prefixes are not rebuilt for every
+entry, a schema is escaped once, and a table or view name is a single
+concatenation.
+"""
+from typing import Callable, Dict, Tuple
+
+NameBuilder = Callable[..., str]
+
+
+def _segment(dataset: str, schema: str) -> str:
+    """Gets the part of a dataset name that follows the name of its schema."""
+    if not dataset.startswith(schema):
+        raise ValueError(f"Name {dataset} doesn't start with the name of "
+                         f"its schema {schema}")
+    return dataset[len(schema):]
+
+
+class NameResolver:
+    """Builds the hierarchy names of a run from prefixes computed once.
+
+    Args:
+        config - config of the run
+        entry_types - EntryType enum of the connector, with INSTANCE,
+                      DATABASE, DB_SCHEMA, TABLE and VIEW members
+        create_name - builds a Dataplex v2 hierarchy name of an entry type,
+                      schema and table
+        create_fqn - builds a fully qualified name with the same arguments
+        escape_name - escapes a schema name within names
+        escape_fqn - escapes a schema name within fully qualified names
+    """
+
+    def __init__(self, config: Dict[str, str], entry_types,
+                 create_name: NameBuilder, create_fqn: NameBuilder,
+                 escape_name: Callable[[str], str],
+                 escape_fqn: Callable[[str], str]):
+        self._escape_name = escape_name
+        self._escape_fqn = escape_fqn
+        self.instance_name = create_name(config, entry_types.INSTANCE)
+        self.instance_fqn = create_fqn(config, entry_types.INSTANCE)
+        self.database_name = create_name(config, entry_types.DATABASE)
+        self.database_fqn = create_fqn(config, entry_types.DATABASE)
+        # Built for an empty schema, the prefixes end with the separator
+        self.schema_name_prefix = create_name(config, entry_types.DB_SCHEMA)
+        self.schema_fqn_prefix = create_fqn(config, entry_types.DB_SCHEMA)
+        # Built for an empty table, the names of the datasets of an empty
+        # schema are the separators of the schema and the table
+        self._name_segments = {
+            entry_type: _segment(create_name(config, entry_type),
+                                 self.schema_name_prefix)
+            for entry_type in (entry_types.TABLE, entry_types.VIEW)}
+        self._fqn_segments = {
+            entry_type: _segment(create_fqn(config, entry_type),
+                                 self.schema_fqn_prefix)
+            for entry_type in (entry_types.TABLE, entry_types.VIEW)}
+        self._schemas = {}
+
+    def _schema(self, schema_name: str) -> Tuple[str, str]:
+        """Gets the name and the FQN of a schema, escaped once per schema."""
+        names = self._schemas.get(schema_name)
+        if names is None:
+            names = (self.schema_name_prefix + self._escape_name(schema_name),
+                     self.schema_fqn_prefix + self._escape_fqn(schema_name))
+            self._schemas[schema_name] = names
+        return names
+
+    def schema_name(self, schema_name: str) -> str:
+        """Creates a Dataplex v2 hierarchy name of a schema."""
+        return self._schema(schema_name)[0]
+
+    def schema_fqn(self, schema_name: str) -> str:
+        """Creates a fully qualified name of a schema."""
+        return self._schema(schema_name)[1]
+
+    def name_segment(self, entry_type) -> str:
+        """Gets the part of the name between the schema and the table."""
+        return self._name_segments[entry_type]
+
+    def fqn_segment(self, entry_type) -> str:
+        """Gets the part of the FQN between the schema and the table."""
+        return self._fqn_segments[entry_type]
+
+    def dataset_prefixes(self, entry_type, schema_name: str) -> Tuple[str, str]:
+        """Gets the name and the FQN prefixes of tables or views in a schema."""
+        name, fqn = self._schema(schema_name)
+        return (name + self.name_segment(entry_type),
+                fqn + self.fqn_segment(entry_type))
+
+    def dataset_name(self, entry_type, schema_name: str,
+                     table_name: str) -> str:
+        """Creates a Dataplex v2 hierarchy name of a table or a view."""
+        return self.dataset_prefixes(entry_type, schema_name)[0] + table_name
+
+    def dataset_fqn(self, entry_type, schema_name: str,
+                    table_name: str) -> str:
+        """Creates a fully qualified name of a table or a view."""
+        return self.dataset_prefixes(entry_type, schema_name)[1] + table_name
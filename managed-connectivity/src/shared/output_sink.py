@@ -0,0 +1,237 @@
+"""Destinations of the connector output, selected by the URI scheme.
+
+    gs://bucket or bucket  -- Cloud Storage bucket
+    file:///path/to/dir    -- local directory, for debugging and offline runs
+    memory://name          -- in-process store, for tests and benchmarks
+
+Local and in-memory sinks don't need network access, so a pipeline can be
+tested and its throughput measured without a GCP project.
+"""
+import os
+import shutil
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+import google_crc32c
+
+from sharded_writer import ChecksumMismatchError, encode_crc32c
+
+
+class OutputSink:
+    """Folder-structured storage where the connector output is written.
+
+    Paths are relative to the root of the sink, separated with "/".
+    """
+
+    def uri(self, path: str) -> str:
+        """Gets the URI of a path, e.g. for the Spark writers."""
+        raise NotImplementedError
+
+    def exists(self) -> bool:
+        """Checks the root of the sink exists."""
+        raise NotImplementedError
+
+    def opener(self, folder: str) -> Callable[[str], BinaryIO]:
+        """Gets a function opening files of the folder for writing."""
+        raise NotImplementedError
+
+    def upload_files(self, filenames: List[str], folder: str):
+        """Copies local files to the folder, with their base names."""
+        raise NotImplementedError
+
+    def read_text(self, path: str) -> Optional[str]:
+        """Reads a small text file, None if it doesn't exist."""
+        raise NotImplementedError
+
+    def write_text(self, path: str, text: str):
+        """Writes a small text file."""
+        raise NotImplementedError
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        """Reads a file, None if it doesn't exist."""
+        raise NotImplementedError
+
+    def verify(self, folder: str, shards: List[Dict]):
+        """Checks files of the folder against CRC32C of the manifest shards."""
+        for shard in shards:
+            data = self.read_bytes(f"{folder}/{shard['name']}")
+            if data is None or \
+                    encode_crc32c(google_crc32c.Checksum(data)) != shard["crc32c"]:
+                raise ChecksumMismatchError(
+                    f"{self.uri(folder)}/{shard['name']} doesn't match "
+                    f"CRC32C {shard['crc32c']} of the written content")
+
+
+class GcsSink(OutputSink):
+    """Cloud Storage bucket."""
+
+    def __init__(self, bucket_name: str, project: Optional[str] = None,
+                 chunk_size: Optional[int] = None, max_workers: Optional[int] = None):
+        # Imported here, so other sinks don't need the GCS libraries
+        import gcs_transfer
+        self._transfer = gcs_transfer
+        self.bucket_name = bucket_name
+        self._project = project
+        self._chunk_size = chunk_size or gcs_transfer.DEFAULT_STREAM_CHUNK_SIZE
+        self._max_workers = max_workers or gcs_transfer.DEFAULT_MAX_WORKERS
+
+    @property
+    def bucket(self):
+        """Bucket bound to the shared storage client."""
+        return self._transfer.get_client(self._project).bucket(self.bucket_name)
+
+    def uri(self, path: str) -> str:
+        return f"gs://{self.bucket_name}/{path}"
+
+    def exists(self) -> bool:
+        return self.bucket.exists()
+
+    def opener(self, folder: str) -> Callable[[str], BinaryIO]:
+        return self._transfer.blob_opener(self.bucket_name, folder,
+                                          chunk_size=self._chunk_size,
+                                          project=self._project)
+
+    def upload_files(self, filenames: List[str], folder: str):
+        self._transfer.upload_files(self.bucket_name, filenames, folder,
+                                    max_workers=self._max_workers,
+                                    project=self._project)
+
+    def read_text(self, path: str) -> Optional[str]:
+        blob = self.bucket.blob(path)
+        if not blob.exists():
+            return None
+        return blob.download_as_text()
+
+    def write_text(self, path: str, text: str):
+        self.bucket.blob(path).upload_from_string(text)
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        blob = self.bucket.blob(path)
+        if not blob.exists():
+            return None
+        return blob.download_as_bytes()
+
+    def verify(self, folder: str, shards: List[Dict]):
+        # Checksums are compared with the object metadata, not downloaded
+        self._transfer.verify_shards(self.bucket, folder, shards)
+
+
+class LocalSink(OutputSink):
+    """Directory of the local filesystem."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, path: str) -> str:
+        return os.path.join(self.root, *path.split("/"))
+
+    def _open(self, path: str, mode: str, **kwargs):
+        full_path = self._path(path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        return open(full_path, mode, **kwargs)
+
+    def uri(self, path: str) -> str:
+        return f"file://{self._path(path)}"
+
+    def exists(self) -> bool:
+        os.makedirs(self.root, exist_ok=True)
+        return True
+
+    def opener(self, folder: str) -> Callable[[str], BinaryIO]:
+        return lambda name: self._open(f"{folder}/{name}", "wb")
+
+    def upload_files(self, filenames: List[str], folder: str):
+        for filename in filenames:
+            with open(filename, "rb") as source, \
+                    self._open(f"{folder}/{os.path.basename(filename)}", "wb") as target:
+                shutil.copyfileobj(source, target)
+
+    def read_text(self, path: str) -> Optional[str]:
+        if not os.path.exists(self._path(path)):
+            return None
+        with open(self._path(path), encoding="utf-8") as file:
+            return file.read()
+
+    def write_text(self, path: str, text: str):
+        with self._open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        if not os.path.exists(self._path(path)):
+            return None
+        with open(self._path(path), "rb") as file:
+            return file.read()
+
+
+class _MemoryFile:
+    """Binary writer which stores the content in a MemorySink when closed."""
+
+    def __init__(self, objects: Dict[str, bytes], path: str):
+        self._objects = objects
+        self._path = path
+        self._chunks = []
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if not self.closed:
+            self._objects[self._path] = b"".join(self._chunks)
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MemorySink(OutputSink):
+    """In-process store. Sinks with the same name share their objects."""
+
+    _stores: Dict[str, Dict[str, bytes]] = {}
+
+    def __init__(self, name: str):
+        self.name = name
+        self.objects = MemorySink._stores.setdefault(name, {})
+
+    def uri(self, path: str) -> str:
+        return f"memory://{self.name}/{path}"
+
+    def exists(self) -> bool:
+        return True
+
+    def opener(self, folder: str) -> Callable[[str], BinaryIO]:
+        return lambda name: _MemoryFile(self.objects, f"{folder}/{name}")
+
+    def upload_files(self, filenames: List[str], folder: str):
+        for filename in filenames:
+            with open(filename, "rb") as file:
+                self.objects[f"{folder}/{os.path.basename(filename)}"] = file.read()
+
+    def read_text(self, path: str) -> Optional[str]:
+        data = self.read_bytes(path)
+        return None if data is None else data.decode("utf-8")
+
+    def write_text(self, path: str, text: str):
+        self.objects[path] = text.encode("utf-8")
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        return self.objects.get(path)
+
+
+def create_sink(output_bucket: str, project: Optional[str] = None,
+                chunk_size: Optional[int] = None,
+                max_workers: Optional[int] = None) -> OutputSink:
+    """Creates the sink of an output bucket URI. No scheme means GCS."""
+    location = output_bucket.rstrip("/")
+    if location.startswith("file://"):
+        return LocalSink(location.removeprefix("file://"))
+    if location.startswith("memory://"):
+        return MemorySink(location.removeprefix("memory://"))
+    return GcsSink(location.removeprefix("gs://"), project=project,
+                   chunk_size=chunk_size, max_workers=max_workers)
@@ -0,0 +1,147 @@
+"""JSONL output split into shards, with a manifest of the shards."""
+import base64
+import gzip
+import json
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional
+
+import google_crc32c
+
+# Rollover limits used when a connector doesn't configure its own
+DEFAULT_MAX_SHARD_ENTRIES = 0
+DEFAULT_MAX_SHARD_BYTES = 100 * 1024 * 1024
+
+
+class ChecksumMismatchError(Exception):
+    """Written object doesn't match its checksum in the manifest."""
+
+
+def encode_crc32c(checksum: google_crc32c.Checksum) -> str:
+    """Encodes CRC32C as GCS does in the crc32c metadata of an object."""
+    return base64.b64encode(checksum.digest()).decode("ascii")
+
+
+def manifest_path(folder: str) -> str:
+    """Gets the path of the manifest of an output folder.
+
+    The manifest is kept next to the folder, not in it, because an import
+    job reads every file of the folder as import items.
+    """
+    return f"{folder.rstrip('/')}.manifest.json"
+
+
+class _GzipStream(gzip.GzipFile):
+    """Gzip stream which also closes the object it writes to."""
+
+    def close(self):
+        raw = self.fileobj
+        super().close()
+        if raw is not None:
+            raw.close()
+
+
+def gzip_opener(opener: Callable[[str], BinaryIO],
+                compresslevel: int = 6) -> Callable[[str], BinaryIO]:
+    """Wraps an opener of shards, so the shards are gzip-compressed."""
+    return lambda name: _GzipStream(fileobj=opener(name), mode="wb",
+                                    compresslevel=compresslevel)
+
+
+class ShardedJsonlWriter:
+    """Writes JSONL lines to shards, starting a new shard at the limits.
+
+    A limit of 0 means no limit. Shards are opened with the opener, which
+    gets a shard name and returns a binary file-like object, e.g. a local
+    file or a GCS blob writer. Entry counts, sizes and CRC32C checksums of
+    the manifest describe the JSONL content passed to the opened objects.
+
+    Usage:
+        with ShardedJsonlWriter(opener, "oracle-output-ORCL") as writer:
+            writer.write_all(json_strings)
+        save(writer.manifest_json())
+    """
+
+    def __init__(self, opener: Callable[[str], BinaryIO], prefix: str,
+                 max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 suffix: str = ".jsonl"):
+        self._opener = opener
+        self._prefix = prefix
+        self._suffix = suffix
+        self._max_entries = DEFAULT_MAX_SHARD_ENTRIES \
+            if max_entries is None else max_entries
+        self._max_bytes = DEFAULT_MAX_SHARD_BYTES \
+            if max_bytes is None else max_bytes
+        self._file = None
+        self._checksum = None
+        self._shard = None
+        self.shards: List[Dict] = []
+
+    @property
+    def entries_count(self) -> int:
+        """Number of lines written to all shards."""
+        return sum(shard["entries"] for shard in self.shards)
+
+    def _needs_rollover(self, size: int) -> bool:
+        if self._shard is None:
+            return True
+        if self._shard["entries"] == 0:
+            return False
+        if self._max_entries and self._shard["entries"] >= self._max_entries:
+            return True
+        return bool(self._max_bytes) and \
+            self._shard["bytes"] + size > self._max_bytes
+
+    def _open_shard(self):
+        self._close_shard()
+        name = f"{self._prefix}-{len(self.shards):05d}{self._suffix}"
+        self._file = self._opener(name)
+        self._checksum = google_crc32c.Checksum()
+        self._shard = {"name": name, "entries": 0, "bytes": 0}
+        self.shards.append(self._shard)
+
+    def _close_shard(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._shard["crc32c"] = encode_crc32c(self._checksum)
+        self._file = None
+
+    def write(self, string: str):
+        """Writes one JSONL line."""
+        data = (string + "\n").encode("utf-8")
+        if self._needs_rollover(len(data)):
+            self._open_shard()
+        self._file.write(data)
+        self._checksum.update(data)
+        self._shard["entries"] += 1
+        self._shard["bytes"] += len(data)
+
+    def write_all(self, strings: Iterable[str]) -> int:
+        """Writes JSONL lines, returns the number of lines written."""
+        count = 0
+        for string in strings:
+            self.write(string)
+            count += 1
+        return count
+
+    def close(self):
+        """Closes the last shard."""
+        self._close_shard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def manifest(self) -> Dict:
+        """Describes the written shards."""
+        return {
+            "entries": self.entries_count,
+            "bytes": sum(shard["bytes"] for shard in self.shards),
+            "shards": self.shards,
+        }
+
+    def manifest_json(self) -> str:
+        """Serializes the manifest to JSON."""
+        return json.dumps(self.manifest(), indent=2)
@@ -0,0 +1,65 @@
+"""Mapping of native types to metadata types with regular expression rules.
+
+Rules are an ordered list of (regex, metadata type) pairs. The first rule
+which matches the whole native type wins, unmatched types become OTHER.
+Every connector has its own rules, METADATA_TYPE_RULES in its constants.py.
+"""
+import json
+import re
+from typing import Callable, Dict, List, Tuple
+
+Rules = List[Tuple[str, str]]
+
+UNMATCHED_TYPE = "OTHER"
+
+
+def load_type_rules(config: Dict, default_rules: Rules) -> Rules:
+    """Gets the rules from the type_rules JSON file, or the default ones."""
+    if not config.get("type_rules"):
+        return default_rules
+    with open(config["type_rules"], encoding="utf-8") as file:
+        return [tuple(rule) for rule in json.load(file)]
+
+
+def create_metadata_type_mapping(rules: Rules) -> Callable[[str], str]:
+    """Creates a function mapping one native type at a time."""
+    compiled = [(re.compile(pattern), metadata_type)
+                for pattern, metadata_type in rules]
+    cache = {}
+
+    def choose_metadata_type(data_type: str) -> str:
+        # A catalog has only a few distinct types, so every one is matched once
+        if data_type not in cache:
+            cache[data_type] = next(
+                (metadata_type for pattern, metadata_type in compiled
+                 if data_type is not None and pattern.fullmatch(data_type)),
+                UNMATCHED_TYPE)
+        return cache[data_type]
+
+    return choose_metadata_type
+
+
+def create_metadata_type_pandas_udf(rules: Rules):
+    """Creates a vectorized mapping of native types to metadata types.
+
+    Returns:
+        Arrow-backed pandas UDF, which maps the native types in batches.
+    """
+    # PySpark and pandas are only required by this type mapping, so the
+    # connectors which build entries without Spark don't import them
+    import pandas as pd
+    import pyspark.sql.functions as F
+    from pyspark.sql.types import StringType
+
+    @F.pandas_udf(StringType())
+    def choose_metadata_type_pandas_udf(data_type: pd.Series) -> pd.Series:
+        """Choose the metadata types of a batch of native types."""
+        metadata_type = pd.Series(UNMATCHED_TYPE, index=data_type.index)
+        unmatched = pd.Series(True, index=data_type.index)
+        for pattern, rule_type in rules:
+            matched = unmatched & data_type.str.fullmatch(pattern, na=False)
+            metadata_type[matched] = rule_type
+            unmatched &= ~matched
+        return metadata_type
+
+    return choose_metadata_type_pandas_udf